@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PMCC backtester on a synthetic chain-archive history.
+
+Writes daily snapshots for synthetic tickers (H0000, ...) into a temporary
+archive, then times loading it, one backtest, and a parameter sweep.
+
+python benchmarks/bench_backtest.py --tickers 4 --days 250 --sweep-workers 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+from pmcc_archive import ChainArchive  # noqa: E402
+from pmcc_backtest import backtest, load_days, sweep  # noqa: E402
+from pmcc_multi_screener import PMCCSelectionConfig  # noqa: E402
+from synthetic import write_history  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PMCC backtester benchmark on a synthetic archive")
+    ap.add_argument("--tickers", type=int, default=4)
+    ap.add_argument("--days", type=int, default=250, help="Business days of history")
+    ap.add_argument("--strikes", type=int, default=60)
+    ap.add_argument("--sweep-workers", type=int, default=0, help="Processes for the sweep (0 = CPU count)")
+    ap.add_argument("--archive", type=str, default="", help="Reuse/keep this archive instead of a temp dir")
+    args = ap.parse_args()
+
+    root = args.archive or tempfile.mkdtemp(prefix="pmcc_bt_")
+    try:
+        archive = ChainArchive(root)
+        if not os.path.isdir(root) or not os.listdir(root):
+            t0 = time.perf_counter()
+            write_history(archive, args.tickers, datetime(2024, 1, 2), args.days, n_strikes=args.strikes)
+            print(f"write   {time.perf_counter() - t0:8.2f}s  ({args.tickers} tickers x {args.days} days)")
+
+        t0 = time.perf_counter()
+        days = load_days(archive)
+        rows = sum(len(g) for _, g in days)
+        print(f"load    {time.perf_counter() - t0:8.2f}s  ({len(days)} days, {rows:,} rows)")
+
+        cfg = PMCCSelectionConfig(max_leaps_iv=1.5)
+        t0 = time.perf_counter()
+        _, _, summary = backtest(days, cfg)
+        elapsed = time.perf_counter() - t0
+        print(f"backtest{elapsed:8.2f}s  ({elapsed / max(len(days), 1) * 1000:.1f} ms/day)  {summary}")
+
+        grid = {"short_delta_high": [0.30, 0.35, 0.40], "early_close_buffer": [0.20, 0.30]}
+        t0 = time.perf_counter()
+        table = sweep(root, grid, cfg=cfg, workers=args.sweep_workers or None)
+        print(f"sweep   {time.perf_counter() - t0:8.2f}s  ({len(table)} configs)")
+        print(table.to_string(index=False))
+    finally:
+        if not args.archive:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
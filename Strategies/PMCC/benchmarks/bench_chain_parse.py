@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark chain parsing: parse time, peak allocation and resulting frame size
+for parse_chain_rows against the old row-by-row parser, on large synthetic
+multi-expiry chains (SPY/QQQ scale has thousands of strikes). The parsed
+values must match the old parser's and parse_chain_rows must not be slower
+(best of --repeat, within --max-ratio); the run exits non-zero otherwise.
+
+python benchmarks/bench_chain_parse.py --expiries 30 --strikes 200,500
+python benchmarks/bench_chain_parse.py --expiries 6 --strikes 100,500,2500
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pmcc_multi_screener import parse_chain_rows  # noqa: E402
+from synthetic import make_chain_rows  # noqa: E402
+
+
+def parse_money(value: str) -> Optional[float]:
+    """The previous per-value money parser used by rowwise_parse."""
+    if value is None: return None
+    s = str(value).strip().replace("$","").replace(",","")
+    if s in ("--","-",""): return None
+    try: return float(s)
+    except: return None
+
+
+def rowwise_parse(rows):
+    """The previous per-row dict builder, kept here as the comparison baseline."""
+    recs = []
+    expiry = ""
+    for r in rows:
+        if r.get("expirygroup") is not None and r.get("expirygroup") != "":
+            expiry = r.get("expirygroup")
+        else:
+            recs.append({
+                "expiryDate": expiry,
+                "strike": parse_money(r.get("strike")),
+                "bid": parse_money(r.get("c_Bid")),
+                "ask": parse_money(r.get("c_Ask")),
+                "last": parse_money(r.get("c_Last")),
+                "volume": 0 if (r.get("c_Volume") in (None,"--")) else int(str(r.get("c_Volume")).replace(",","")),
+                "openInterest": 0 if (r.get("c_Openinterest") in (None,"--")) else int(str(r.get("c_Openinterest")).replace(",","")),
+                "detail_path": r.get("drillDownURL"),
+            })
+    df = pd.DataFrame(recs)
+    if not df.empty:
+        df["mid"] = (df["bid"].fillna(0) + df["ask"].fillna(0)) / 2
+    return df
+
+
+def same_values(old: pd.DataFrame, new: pd.DataFrame) -> bool:
+    if len(old) != len(new):
+        return False
+    for col in old.columns:
+        a, b = old[col], new[col]
+        if col in ("expiryDate", "detail_path"):
+            if list(a.astype(object)) != list(b.astype(object)):
+                return False
+        elif not np.allclose(a.astype(float), b.astype(float), rtol=1e-6, equal_nan=True):
+            return False
+    return True
+
+
+def measure(fn, rows, repeat: int):
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    df = fn(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Chain parser benchmark")
+    ap.add_argument("--expiries", type=int, default=30)
+    ap.add_argument("--strikes", type=str, default="200,500", help="Comma-separated strikes per expiry")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-ratio", type=float, default=1.0,
+                    help="Fail if the columnar parser takes longer than this multiple of the row-wise one")
+    args = ap.parse_args()
+
+    failed = False
+    print(f"{'contracts':>10} {'parser':>9} {'best_s':>8} {'peak_MB':>8} {'frame_MB':>9}")
+    for n in [int(x) for x in args.strikes.split(",") if x.strip()]:
+        rows = make_chain_rows("SPY", spot=550.0, n_expiries=args.expiries, strikes_per_expiry=n)
+        contracts = sum(1 for r in rows if not r["expirygroup"])
+        best = {}
+        for name, fn in (("rowwise", rowwise_parse), ("columnar", parse_chain_rows)):
+            best[name], peak, size = measure(fn, rows, args.repeat)
+            print(f"{contracts:>10} {name:>9} {best[name]:>8.3f} {peak / 2**20:>8.1f} {size / 2**20:>9.2f}")
+        if not same_values(rowwise_parse(rows), parse_chain_rows(rows)):
+            print(f"{contracts:>10} MISMATCH: parsed values differ from the row-wise parser")
+            failed = True
+        if best["columnar"] > best["rowwise"] * args.max_ratio:
+            print(f"{contracts:>10} SLOWER: columnar {best['columnar']:.3f}s vs row-wise {best['rowwise']:.3f}s")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
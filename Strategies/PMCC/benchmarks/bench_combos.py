@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark build_combos throughput (rows/sec) on synthetic LEAPS x shorts frames.
+
+Before timing, the vectorized cross join is checked against the previous
+nested iterrows loop (kept below as nested_loop_combos) on a multi-ticker set
+with zero mids/strikes, shorts inside the cushion and a ticker without shorts.
+Rows, their order and values must match; the run exits non-zero otherwise.
+
+python benchmarks/bench_combos.py --sizes 10000,100000,1000000
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pmcc_multi_screener import build_combos, combos_for_ticker, sort_combos  # noqa: E402
+
+
+def synthetic_legs(n_combos: int, tickers: int = 1, seed: int = 0):
+    """Per-ticker LEAPS/short frames whose cross product is ~n_combos rows in total."""
+    rng = np.random.default_rng(seed)
+    side = max(1, int(math.sqrt(n_combos / tickers)))
+    all_leaps, all_shorts = [], []
+    for t in range(tickers):
+        spot = 100.0
+        leaps = pd.DataFrame({
+            "expiryDate": rng.choice(["January 15, 2027", "June 17, 2027", "December 17, 2027"], side),
+            "strike": np.round(rng.uniform(40, 90, side)),
+            "mid": np.round(rng.uniform(15, 60, side), 2),
+            "delta": rng.uniform(0.75, 0.85, side),
+            "iv": rng.uniform(0.2, 0.6, side),
+        })
+        shorts = pd.DataFrame({
+            "expiryDate": rng.choice(["October 17, 2025", "November 21, 2025"], side),
+            "strike": np.round(rng.uniform(105, 140, side)),
+            "mid": np.round(rng.uniform(0.5, 5, side), 2),
+            "delta": rng.uniform(0.25, 0.40, side),
+            "iv": rng.uniform(0.2, 0.6, side),
+        })
+        for df in (leaps, shorts):
+            df["ticker"] = f"T{t:04d}"
+            df["spot"] = spot
+        all_leaps.append(leaps)
+        all_shorts.append(shorts)
+    return all_leaps, all_shorts
+
+
+def nested_loop_combos(all_leaps, all_shorts, early_close_buffer: float = 0.30,
+                       min_cushion_pct: float = 2.5) -> pd.DataFrame:
+    """The previous build_combos loop (before sorting), kept here as the parity reference."""
+    rows = []
+    for leaps_df in all_leaps:
+        if leaps_df.empty:
+            continue
+        ticker = leaps_df["ticker"].iloc[0]
+        match = [s for s in all_shorts if (not s.empty and s["ticker"].iloc[0] == ticker)]
+        if not match:
+            continue
+        shorts_df = match[0]
+        spot = float(leaps_df.get("spot", [float("nan")])[0]) if "spot" in leaps_df.columns else float("nan")
+
+        for _, L in leaps_df.iterrows():
+            leap_mid   = float(L.get("mid") or 0.0)
+            leap_strk  = float(L.get("strike") or 0.0)
+            if leap_mid <= 0 or leap_strk <= 0:
+                continue
+            leap_intrinsic = max((spot - leap_strk), 0.0) if not math.isnan(spot) else float("nan")
+            intrinsic_pct_of_price = (leap_intrinsic / leap_mid) * 100.0 if leap_mid > 0 and not math.isnan(leap_intrinsic) else float("nan")
+
+            for _, S in shorts_df.iterrows():
+                short_mid   = float(S.get("mid") or 0.0)
+                short_strk  = float(S.get("strike") or 0.0)
+                if short_mid <= 0 or short_strk <= 0:
+                    continue
+                metric2 = (short_mid / leap_mid) * 100.0 if leap_mid > 0 else float("nan")
+                net_debit = (leap_mid - short_mid)
+                cushion_pct = ((short_strk - spot) / spot) * 100.0 if not math.isnan(spot) and spot > 0 else float("nan")
+                itm_close_pl_per_spread = ((short_strk - leap_strk) - early_close_buffer + short_mid - leap_mid) * 100.0
+                roi_itm_close_pct = (itm_close_pl_per_spread / (net_debit * 100.0)) * 100.0 if net_debit > 0 else float("nan")
+                if cushion_pct > min_cushion_pct:
+                    rows.append({
+                        "ticker": ticker, "spot": spot,
+                        "leap_expiry": L.get("expiryDate"), "leap_strike": leap_strk, "leap_mid": leap_mid,
+                        "leap_delta": float(L.get("delta") or 0.0), "leap_iv": float(L.get("iv") or 0.0),
+                        "leap_intrinsic_now": leap_intrinsic, "leap_intrinsic_pct_of_price": intrinsic_pct_of_price,
+                        "short_expiry": S.get("expiryDate"), "short_strike": short_strk, "short_mid": short_mid,
+                        "short_delta": float(S.get("delta") or 0.0), "short_iv": float(S.get("iv") or 0.0),
+                        "cushion_to_short_strike_pct": cushion_pct,
+                        "net_debit_per_spread": net_debit,
+                        "itm_close_pl_per_spread_$": itm_close_pl_per_spread,
+                        "itm_close_roi_pct_on_net": roi_itm_close_pct,
+                        "metric2_premium_over_leap_price_pct": metric2,
+                    })
+    return pd.DataFrame(rows)
+
+
+def parity_legs(n_combos: int, tickers: int = 4, seed: int = 1):
+    """synthetic_legs with the loop's edge cases mixed in; the last ticker has no shorts."""
+    rng = np.random.default_rng(seed)
+    all_leaps, all_shorts = synthetic_legs(n_combos, tickers=tickers, seed=seed)
+    for leaps, shorts in zip(all_leaps, all_shorts):
+        n = len(leaps)
+        leaps.loc[rng.choice(n, max(1, n // 10), replace=False), "mid"] = 0.0
+        leaps.loc[rng.choice(n, max(1, n // 20), replace=False), "strike"] = 0.0
+        m = len(shorts)
+        shorts.loc[rng.choice(m, max(1, m // 10), replace=False), "mid"] = 0.0
+        # at or inside the 2.5% cushion (spot is 100)
+        shorts.loc[rng.choice(m, max(1, m // 5), replace=False), "strike"] = rng.choice([95.0, 100.0, 102.5, 103.0])
+        shorts.loc[rng.choice(m, max(1, m // 20), replace=False), ["delta", "iv"]] = np.nan
+    return all_leaps, all_shorts[:-1]
+
+
+def check_parity(n_combos: int) -> bool:
+    all_leaps, all_shorts = parity_legs(n_combos)
+    ref = nested_loop_combos(all_leaps, all_shorts)
+    shorts_by_ticker = {s["ticker"].iloc[0]: s for s in all_shorts}
+    parts = [combos_for_ticker(l, shorts_by_ticker[l["ticker"].iloc[0]])
+             for l in all_leaps if l["ticker"].iloc[0] in shorts_by_ticker]
+    new = pd.concat(parts, ignore_index=True)[list(ref.columns)]
+    ok = True
+    for name, (a, b) in {"cross join order": (ref, new),
+                         "ranked": (sort_combos(ref, "metric2"),
+                                    build_combos(all_leaps, all_shorts, sort_key="metric2")[list(ref.columns)])}.items():
+        try:
+            pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True),
+                                          check_dtype=False, rtol=1e-12)
+            print(f"parity ({name}): ok, {len(a)} rows match the nested loop")
+        except AssertionError as e:
+            print(f"parity ({name}): MISMATCH\n{e}")
+            ok = False
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="build_combos throughput benchmark")
+    ap.add_argument("--sizes", type=str, default="10000,100000,1000000",
+                    help="Comma-separated target combo counts")
+    ap.add_argument("--tickers", type=int, default=1, help="Spread each size across this many tickers")
+    ap.add_argument("--repeat", type=int, default=3, help="Best-of-N timing")
+    ap.add_argument("--parity-rows", type=int, default=20000,
+                    help="Approximate combos for the nested-loop parity check (0 = skip)")
+    args = ap.parse_args()
+
+    if args.parity_rows and not check_parity(args.parity_rows):
+        sys.exit(1)
+
+    print(f"{'combos':>10} {'rows':>10} {'best_s':>9} {'rows/sec':>12}")
+    for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        all_leaps, all_shorts = synthetic_legs(size, tickers=args.tickers)
+        best, rows = float("inf"), 0
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            combos = build_combos(all_leaps, all_shorts, sort_key="metric2", min_cushion_pct=2.5)
+            best = min(best, time.perf_counter() - t0)
+            rows = len(combos)
+        print(f"{size:>10} {rows:>10} {best:>9.3f} {rows / best:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark combo export: write time, peak memory and file size at large row counts.
+
+Builds a synthetic ranked combos frame (via build_combos), saves it once, and
+then runs every export in a fresh process so peak RSS is not shared between
+cases. Memory is reported as the peak RSS growth over the loaded frame.
+
+  pandas_csv / pandas_excel   combos.to_csv / default pd.ExcelWriter (before)
+  stream_csv / stream_excel   export_csv / write-only export_excel, compacting each batch
+  stream_excel_per_ticker     the same, plus one sheet per ticker
+
+python benchmarks/bench_export.py --rows 1000000
+python benchmarks/bench_export.py --rows 100000 --baseline-max-rows 100000
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+CASES = ("pandas_csv", "stream_csv", "pandas_excel", "stream_excel", "stream_excel_per_ticker")
+
+
+def _rss_mb() -> float:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_case(case: str, frame_path: str, out_dir: str):
+    import pandas as pd
+    from pmcc_export import export_csv, export_excel
+
+    combos = pd.read_pickle(frame_path)
+    base = _rss_mb()
+    path = os.path.join(out_dir, case + (".csv" if case.endswith("csv") else ".xlsx"))
+    t0 = time.perf_counter()
+    if case == "pandas_csv":
+        combos.to_csv(path, index=False)
+    elif case == "pandas_excel":
+        with pd.ExcelWriter(path) as writer:
+            combos.to_excel(writer, sheet_name="Combos", index=False)
+    elif case == "stream_csv":
+        export_csv(combos, path, compact=True)
+    else:
+        export_excel(combos, path, per_ticker=case.endswith("per_ticker"), compact=True)
+    return time.perf_counter() - t0, _rss_mb() - base, os.path.getsize(path) / 1024 / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Combo export benchmark (CSV / Excel)")
+    ap.add_argument("--rows", type=int, default=1_000_000, help="Approximate combo rows")
+    ap.add_argument("--tickers", type=int, default=20)
+    ap.add_argument("--cases", type=str, default=",".join(CASES), help=f"Subset of {', '.join(CASES)}")
+    ap.add_argument("--baseline-max-rows", type=int, default=200_000,
+                    help="Skip pandas_excel above this many rows (the default writer needs minutes and GBs)")
+    args = ap.parse_args()
+
+    from bench_combos import synthetic_legs
+    from pmcc_multi_screener import build_combos
+
+    tmp = tempfile.mkdtemp(prefix="pmcc_export_")
+    try:
+        all_leaps, all_shorts = synthetic_legs(args.rows, tickers=args.tickers)
+        combos = build_combos(all_leaps, all_shorts, sort_key="metric2")
+        frame_path = os.path.join(tmp, "combos.pkl")
+        combos.to_pickle(frame_path)
+        print(f"{len(combos):,} combos, {combos.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB in memory")
+        del combos, all_leaps, all_shorts
+
+        print(f"{'case':<24} {'write_s':>9} {'peak_mb':>9} {'file_mb':>9}")
+        for case in [c.strip() for c in args.cases.split(",") if c.strip()]:
+            if case == "pandas_excel" and args.rows > args.baseline_max_rows:
+                print(f"{case:<24} {'skipped (--baseline-max-rows)':>29}")
+                continue
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, peak, size = pool.submit(_run_case, case, frame_path, tmp).result()
+            print(f"{case:<24} {seconds:>9.2f} {peak:>9.1f} {size:>9.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check and measure the ladder Greeks search (add_greeks_in_band) against full
+enrichment (add_greeks) on the local stand-in.
+
+For each synthetic ticker the LEAPS and short windows are fetched, a few
+strikes are blanked out, and both enrichment paths are run. The ladder must
+return exactly the in-band contracts of the full pass with the same Greeks,
+must drop the rows without a strike, and must send fewer detail requests.
+Exits non-zero otherwise.
+
+python benchmarks/bench_greeks_search.py --tickers 3 --expiries 16 --strikes 100
+"""
+
+import os
+import sys
+import argparse
+from datetime import timedelta
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+import pmcc_multi_screener as pmcc  # noqa: E402
+from standin import StandIn  # noqa: E402
+from synthetic import SyntheticUniverse  # noqa: E402
+
+
+def check_window(standin: StandIn, ticker: str, df, low: float, high: float, workers: int):
+    """(full requests, ladder requests, problems) for one window."""
+    standin.reset_counts()
+    full = pmcc.add_greeks(ticker, df, workers=workers)
+    full_requests = standin.counts["requests"]
+    standin.reset_counts()
+    ladder = pmcc.add_greeks_in_band(ticker, df, low, high, workers=workers)
+    ladder_requests = standin.counts["requests"]
+
+    problems = []
+    if ladder["strike"].isna().any():
+        problems.append("rows without a strike were kept")
+    in_band = full[full["strike"].notna() & full["delta"].between(low, high)].set_index("detail_path")
+    got = ladder[ladder["delta"].between(low, high)].set_index("detail_path")
+    if set(in_band.index) != set(got.index):
+        problems.append(f"{len(set(in_band.index) ^ set(got.index))} in-band contracts differ")
+    else:
+        cols = list(pmcc.GREEK_COLS)
+        if not np.allclose(in_band[cols].to_numpy(float), got.loc[in_band.index, cols].to_numpy(float),
+                           equal_nan=True):
+            problems.append("Greeks differ")
+    if len(in_band) < len(full) and ladder_requests >= full_requests:
+        problems.append(f"ladder sent {ladder_requests} requests vs {full_requests} for the full pass")
+    return full_requests, ladder_requests, problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ladder vs full Greeks enrichment: correctness and requests")
+    ap.add_argument("--tickers", type=int, default=3)
+    ap.add_argument("--expiries", type=int, default=16)
+    ap.add_argument("--strikes", type=int, default=100, help="Strikes per expiry")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    universe = SyntheticUniverse(args.tickers, args.expiries, args.strikes)
+    standin = StandIn(universe).start()
+    pmcc.NASDAQ_BASE = standin.base_url
+    pmcc.RESPONSE_CACHE = None
+    pmcc.RATE_LIMITER.set_rate(1e6)
+    pmcc.set_max_inflight(64)
+    cfg = pmcc.PMCCSelectionConfig()
+    day = lambda n: (universe.now + timedelta(days=n)).strftime("%Y-%m-%d")
+    windows = (("leaps", day(365), day(800), "in", cfg.target_leaps_delta_low, cfg.target_leaps_delta_high),
+               ("shorts", day(20), day(60), "out", cfg.short_delta_low, cfg.short_delta_high))
+
+    failed = False
+    print(f"{'ticker':<7} {'window':<7} {'contracts':>9} {'full_req':>9} {'ladder_req':>10}  check")
+    try:
+        for t in universe.tickers:
+            for name, lo_date, hi_date, money, low, high in windows:
+                df, _ = pmcc.fetch_chain(t, lo_date, hi_date, money=money)
+                # low-priced synthetic tickers repeat strikes once rounded to 0.50; keep each contract once
+                df = df.drop_duplicates("detail_path").reset_index(drop=True)
+                df.loc[df.index[::37], "strike"] = np.nan   # unparseable strikes from the chain
+                full_req, ladder_req, problems = check_window(standin, t, df, low, high, args.workers)
+                failed |= bool(problems)
+                print(f"{t:<7} {name:<7} {len(df):>9} {full_req:>9} {ladder_req:>10}  "
+                      f"{'; '.join(problems) if problems else 'ok'}")
+    finally:
+        standin.stop()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
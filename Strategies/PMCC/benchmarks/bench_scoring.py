@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Parity check and timing for the column-wise leg scoring (pmcc_scoring).
+
+Scores synthetic LEAPS/short windows (with zero, missing and crossed quotes
+mixed in) both ways: the row-wise score_leaps_row + sort_values/head
+reference and filter_rank_leaps/filter_rank_shorts. Exits non-zero if any
+score or selected row differs.
+
+The reference LEAPS sort is the original, unstable sort_values, so the order
+within equal scores is whatever quicksort leaves; top_leaps breaks such ties by
+chain order. Equal-score rows are therefore compared as a set, and at the
+top_n cut any of the tied rows may be taken.
+
+python benchmarks/bench_scoring.py --sizes 1000,10000,100000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pmcc_multi_screener import PMCCSelectionConfig, filter_rank_leaps, filter_rank_shorts  # noqa: E402
+
+
+def score_leaps_row(row, cfg: PMCCSelectionConfig) -> float:
+    """The previous per-row LEAPS score, the reference for pmcc_scoring.score_leaps (default weights)."""
+    delta = float(row.get("delta") or 0.0)
+    iv = float(row.get("iv") or 1.0)
+    bid = float(row.get("bid") or 0.0)
+    ask = float(row.get("ask") or 0.0)
+    spr = (ask - bid) / ask if (ask and ask>0) else 1.0
+    vol = int(row.get("volume") or 0)
+    oi  = int(row.get("openInterest") or 0)
+    liq = min(1.0, (vol + oi) / 5000.0)
+
+    delta_score  = 1.0 - min(1.0, abs(delta - 0.80) / 0.20)   # closer to 0.8 better
+    iv_score     = 1.0 - min(1.0, iv / max(cfg.max_leaps_iv, 1e-6))  # lower better
+    spread_score = 1.0 - min(1.0, spr)                        # tighter better
+    liq_score    = liq
+
+    # weights
+    return 0.5*delta_score + 0.2*iv_score + 0.2*spread_score + 0.1*liq_score
+
+
+def legs(n: int, seed: int = 0, float32: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    mid = np.round(rng.uniform(0.05, 60, n), 2)
+    df = pd.DataFrame({
+        "strike": np.round(rng.uniform(10, 200, n) * 2) / 2,
+        "bid": np.round(mid * rng.uniform(0.9, 1.0, n), 2),
+        "ask": np.round(mid * rng.uniform(1.0, 1.1, n), 2),
+        "mid": mid,
+        "volume": rng.integers(0, 4000, n),
+        "openInterest": rng.integers(0, 40000, n),
+        # coarse grids so ties in delta/iv/mid actually occur
+        "delta": np.round(rng.uniform(0.2, 0.9, n), 2),
+        "iv": np.round(rng.uniform(0.0, 0.8, n), 2),
+        "spot": 100.0,
+    })
+    edge = rng.choice(n, size=max(1, n // 20), replace=False)
+    df.loc[edge[0::4], "ask"] = 0.0                     # no ask: spread counts as 100%
+    df.loc[edge[1::4], "bid"] = df.loc[edge[1::4], "ask"] * 1.2   # crossed quote
+    df.loc[edge[2::4], "iv"] = np.nan                   # missing IV
+    df.loc[edge[3::4], ["volume", "openInterest"]] = 0
+    if float32:
+        for c in ("strike", "bid", "ask", "mid", "delta", "iv"):
+            df[c] = df[c].astype(np.float32)
+    return df
+
+
+def reference_leaps(df: pd.DataFrame, cfg: PMCCSelectionConfig, top_n: int) -> pd.DataFrame:
+    df = df[df["delta"].astype(float).between(cfg.target_leaps_delta_low, cfg.target_leaps_delta_high)
+            & (df["iv"].astype(float) <= cfg.max_leaps_iv)].copy()
+    df["score"] = df.apply(lambda r: score_leaps_row(r, cfg), axis=1)
+    return df.sort_values(["score"], ascending=False).head(top_n)
+
+
+def same_leaps(ref: pd.DataFrame, new: pd.DataFrame, scored: pd.DataFrame) -> bool:
+    """Same rows and scores as the reference, ties in any order and either side of the cut."""
+    if len(ref) != len(new) or not np.array_equal(ref["score"].to_numpy(), new["score"].to_numpy()):
+        return False
+    if not new.equals(scored.loc[new.index]):
+        return False
+    cut = ref["score"].min() if len(ref) else None
+    above = lambda d: set(d.index[d["score"] > cut])
+    tied = set(scored.index[scored["score"] == cut])
+    return above(ref) == above(new) and set(new.index[new["score"] == cut]) <= tied
+
+
+def reference_shorts(df: pd.DataFrame, cfg: PMCCSelectionConfig, top_n: int) -> pd.DataFrame:
+    df = df[df["delta"].astype(float).between(cfg.short_delta_low, cfg.short_delta_high)].copy()
+    return df.sort_values(by=["mid", "iv", "delta"], ascending=[False, False, True]).head(top_n)
+
+
+def timed(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Row-wise vs column-wise leg scoring: parity and speed")
+    ap.add_argument("--sizes", type=str, default="1000,10000,100000", help="Comma-separated rows per window")
+    ap.add_argument("--top-n", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=3, help="Best-of-N timing")
+    args = ap.parse_args()
+
+    cfg = PMCCSelectionConfig(max_leaps_iv=0.6)
+    failed = False
+    print(f"{'rows':>8} {'dtype':>7} {'leg':>6} {'apply_s':>9} {'vector_s':>9} {'speedup':>8}  parity")
+    for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        for float32 in (False, True):
+            df = legs(n, seed=n, float32=float32)
+            dtype = "float32" if float32 else "float64"
+            ref_t, ref = timed(lambda: reference_leaps(df, cfg, args.top_n), 1)
+            new_t, new = timed(lambda: filter_rank_leaps(df, cfg, args.top_n), args.repeat)
+            # every score, not just the top_n, must match the row-wise reference bit for bit
+            kept = df[df["delta"].astype(float).between(cfg.target_leaps_delta_low, cfg.target_leaps_delta_high)
+                      & (df["iv"].astype(float) <= cfg.max_leaps_iv)]
+            full = filter_rank_leaps(df, cfg, len(df)).sort_index()
+            scored = kept.assign(score=kept.apply(lambda r: score_leaps_row(r, cfg), axis=1))
+            ok = np.array_equal(full["score"].to_numpy(), scored["score"].to_numpy()) and same_leaps(ref, new, scored)
+            failed |= not ok
+            print(f"{n:>8} {dtype:>7} {'leaps':>6} {ref_t:>9.4f} {new_t:>9.4f} {ref_t / new_t:>7.1f}x  {'ok' if ok else 'MISMATCH'}")
+
+            ref_t, ref = timed(lambda: reference_shorts(df, cfg, args.top_n), args.repeat)
+            new_t, new = timed(lambda: filter_rank_shorts(df, cfg, args.top_n, 100.0), args.repeat)
+            ok = ref.equals(new) and list(ref.index) == list(new.index)
+            failed |= not ok
+            print(f"{n:>8} {dtype:>7} {'shorts':>6} {ref_t:>9.4f} {new_t:>9.4f} {ref_t / new_t:>7.1f}x  {'ok' if ok else 'MISMATCH'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Load test for `pmcc_multi_screener.py serve` against the local stand-in API.
+
+Starts the stand-in (with per-request latency) and the screener's HTTP server
+in-process, then, for each client count, clears the shared cache and has that
+many clients POST /screen at once with overlapping ticker lists. Reports
+responses per second, upstream requests seen by the stand-in and how many
+upstream calls were coalesced. With the shared cache and coalescing, upstream
+requests should stay flat as clients are added while throughput rises;
+separate processes would multiply them by the client count.
+
+python benchmarks/bench_serve.py --clients 1,2,4,8 --tickers 8 --latency-ms 30
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import timedelta
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+import pmcc_multi_screener as pmcc  # noqa: E402
+import pmcc_serve  # noqa: E402
+from standin import StandIn  # noqa: E402
+from synthetic import SyntheticUniverse  # noqa: E402
+
+
+def client_tickers(tickers, i: int, per_client: int):
+    """Client i screens a rotating slice of the universe, so lists overlap but are not identical."""
+    start = (i * max(1, per_client // 2)) % len(tickers)
+    return [tickers[(start + k) % len(tickers)] for k in range(per_client)]
+
+
+def run_level(url: str, standin: StandIn, n_clients: int, requests_per_client: int, body_base: dict,
+              tickers, per_client: int):
+    pmcc.RESPONSE_CACHE = pmcc.MemoryCache()   # cold shared cache for every level
+    pmcc.METRICS.reset()
+    standin.reset_counts()
+    failures, latencies = [], []
+    lock = threading.Lock()
+
+    def client(i: int):
+        with requests.Session() as s:
+            for _ in range(requests_per_client):
+                body = dict(body_base, tickers=",".join(client_tickers(tickers, i, per_client)))
+                t0 = time.perf_counter()
+                r = s.post(f"{url}/screen", json=body, timeout=600)
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+                    if not r.ok or r.json().get("errors"):
+                        failures.append(r.text[:200])
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    counters = pmcc.METRICS.report()["counters"]
+    return {
+        "clients": n_clients,
+        "responses": len(latencies),
+        "wall_s": round(wall, 2),
+        "resp_per_s": round(len(latencies) / wall, 2),
+        "mean_latency_s": round(sum(latencies) / len(latencies), 2),
+        "upstream": standin.counts["requests"],
+        "coalesced": counters.get("coalesced", 0),
+        "cache_hits": counters.get("cache_hits", 0),
+        "failures": len(failures),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test the screener's serve mode against the local stand-in")
+    ap.add_argument("--clients", type=str, default="1,2,4,8", help="Comma-separated concurrent client counts")
+    ap.add_argument("--requests", type=int, default=2, help="Requests per client")
+    ap.add_argument("--tickers", type=int, default=8, help="Synthetic universe size")
+    ap.add_argument("--per-client", type=int, default=4, help="Tickers in each request")
+    ap.add_argument("--latency-ms", type=float, default=30.0, help="Stand-in latency per request")
+    ap.add_argument("--greeks", choices=pmcc.GREEKS_MODES, default="remote")
+    ap.add_argument("--max-inflight", type=int, default=16)
+    args = ap.parse_args()
+
+    universe = SyntheticUniverse(args.tickers, 16, 40)
+    standin = StandIn(universe, latency_ms=args.latency_ms).start()
+    pmcc.NASDAQ_BASE = standin.base_url
+    pmcc.RATE_LIMITER.set_rate(1000.0)
+    pmcc.set_max_inflight(args.max_inflight)
+    enrich = pmcc.EnrichmentConfig(workers=4, mode=args.greeks)
+    server = pmcc_serve.ScreenerServer(("127.0.0.1", 0), enrich, workers=4, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    day = lambda n: (universe.now + timedelta(days=n)).strftime("%Y-%m-%d")
+    body = {"leaps_from": day(365), "leaps_to": day(800), "shorts_from": day(20), "shorts_to": day(60),
+            "max_leaps_iv": 1.0, "sort": "metric2"}
+    print(f"{'clients':>7} {'responses':>9} {'wall_s':>7} {'resp/s':>7} {'latency_s':>9} {'upstream':>8} "
+          f"{'separate':>8} {'coalesced':>9} {'cache_hits':>10} {'failures':>8}")
+    single = None
+    try:
+        for n in [int(x) for x in args.clients.split(",") if x.strip()]:
+            r = run_level(url, standin, n, args.requests, body, universe.tickers, args.per_client)
+            # what n independent processes with their own caches would have sent upstream
+            single = single or r["upstream"] / r["clients"]
+            print(f"{r['clients']:>7} {r['responses']:>9} {r['wall_s']:>7} {r['resp_per_s']:>7} "
+                  f"{r['mean_latency_s']:>9} {r['upstream']:>8} {int(single * n):>8} {r['coalesced']:>9} "
+                  f"{r['cache_hits']:>10} {r['failures']:>8}")
+    finally:
+        server.shutdown()
+        server.server_close()
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark harness for the PMCC screener.
+
+Starts the local stand-in API (benchmarks/standin.py) over a synthetic
+universe, points the screener at it, and reports wall time, requests issued
+(as seen by the server, retries included) and peak traced memory for
+fetch_chain, add_greeks, select_candidates_for_ticker and build_combos at
+several universe sizes. Results are compared with a stored baseline and the
+run exits non-zero on a regression: a request count that differs from the
+baseline in either direction, or time / memory above its tolerance.
+
+python benchmarks/run_bench.py                      # compare with baseline.json
+python benchmarks/run_bench.py --update-baseline    # record a new baseline
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+import pmcc_multi_screener as pmcc  # noqa: E402
+from standin import StandIn  # noqa: E402
+from synthetic import SyntheticUniverse  # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+# name -> (tickers, expiries per ticker, strikes per expiry)
+SIZES = {
+    "small":  (3, 14, 40),
+    "medium": (6, 16, 60),
+    "large":  (12, 16, 100),
+}
+METRICS = ("wall_s", "requests", "peak_mb")
+
+
+def windows(now: datetime) -> Dict[str, str]:
+    day = lambda n: (now + timedelta(days=n)).strftime("%Y-%m-%d")
+    return dict(leaps_from=day(365), leaps_to=day(800), shorts_from=day(20), shorts_to=day(60))
+
+
+def measure(standin: StandIn, fn: Callable[[], object]) -> Dict[str, float]:
+    standin.reset_counts()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"wall_s": round(wall, 4), "requests": standin.counts["requests"], "peak_mb": round(peak / 2**20, 3)}
+
+
+def run_size(standin: StandIn, n_tickers: int, n_expiries: int, n_strikes: int, workers: int) -> Dict[str, Dict]:
+    universe = SyntheticUniverse(n_tickers, n_expiries, n_strikes)
+    standin.universe = universe
+    pmcc.ASSETCLASS_RESOLVER = pmcc.AssetClassResolver()
+    w = windows(universe.now)
+    cfg = pmcc.PMCCSelectionConfig(max_leaps_iv=1.0)
+    enrich = pmcc.EnrichmentConfig(workers=workers)
+    out, state = {}, {}
+
+    def fetch_chains():
+        state["chains"] = {t: pmcc.fetch_chain(t, w["shorts_from"], w["leaps_to"])[0] for t in universe.tickers}
+
+    def enrich_all():
+        # in-the-money LEAPS of each chain, i.e. what a full (non-ladder) Greeks pass fetches
+        for t, df in state["chains"].items():
+            spot, df = universe.chain(t).spot, pmcc.add_dte(df, universe.now)
+            leaps = df[(df["dte"] >= cfg.min_days_to_expiry) & (df["strike"] <= spot)]
+            # low-priced synthetic tickers repeat strikes once rounded to 0.50; how many of those duplicate
+            # requests get coalesced depends on timing, so keep each contract once to make the count exact
+            leaps = leaps.drop_duplicates("detail_path")
+            pmcc.add_greeks(t, leaps, workers=workers)
+
+    def select_all():
+        state["candidates"] = [
+            pmcc.select_candidates_for_ticker(t, **w, cfg=cfg, top_n_leaps=40, top_n_shorts=40, enrich=enrich)
+            for t in universe.tickers]
+
+    def combos():
+        pmcc.build_combos([c[0] for c in state["candidates"]], [c[1] for c in state["candidates"]],
+                          sort_key="metric2", min_cushion_pct=0.0)
+
+    for stage, fn in (("fetch_chain", fetch_chains), ("add_greeks", enrich_all),
+                      ("select_candidates_for_ticker", select_all), ("build_combos", combos)):
+        out[stage] = measure(standin, fn)
+    return out
+
+
+def compare(results: Dict, baseline: Dict, time_tol: float, mem_tol: float) -> list:
+    """Regressions as human-readable strings (empty if none). Request counts must match exactly."""
+    limits = {"wall_s": (time_tol, 0.05), "peak_mb": (mem_tol, 0.5)}
+    problems = []
+    for size, stages in results.items():
+        for stage, metrics in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if not base:
+                continue
+            if metrics["requests"] != base["requests"]:
+                problems.append(f"{size}/{stage}: requests {metrics['requests']} != baseline {base['requests']}")
+            for m in limits:
+                ratio, slack = limits[m]
+                if metrics[m] > base[m] * ratio + slack:
+                    problems.append(f"{size}/{stage}: {m} {metrics[m]} > baseline {base[m]} (x{ratio} + {slack})")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline PMCC screener benchmarks against a local stand-in API")
+    ap.add_argument("--sizes", type=str, default=",".join(SIZES), help=f"Subset of {', '.join(SIZES)}")
+    ap.add_argument("--latency-ms", type=float, default=2.0, help="Stand-in latency per request")
+    ap.add_argument("--workers", type=int, default=8, help="--greeks-workers for the screener")
+    ap.add_argument("--baseline", type=str, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--time-tolerance", type=float, default=1.5, help="Allowed wall-time ratio vs baseline")
+    ap.add_argument("--mem-tolerance", type=float, default=1.25, help="Allowed peak-memory ratio vs baseline")
+    ap.add_argument("--json", type=str, default="", help="Also write results to this file")
+    args = ap.parse_args()
+
+    pmcc.RESPONSE_CACHE = None
+    pmcc.RATE_LIMITER.set_rate(1e6)
+    pmcc.set_max_inflight(64)
+    standin = StandIn(latency_ms=args.latency_ms).start()
+    pmcc.NASDAQ_BASE = standin.base_url
+
+    results = {}
+    try:
+        for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+            print(f"--- {size}: {SIZES[size][0]} tickers x {SIZES[size][1]} expiries x {SIZES[size][2]} strikes ---",
+                  file=sys.stderr)
+            results[size] = run_size(standin, *SIZES[size], workers=args.workers)
+    finally:
+        standin.stop()
+
+    print(f"{'size':<8} {'stage':<30} {'wall_s':>8} {'requests':>9} {'peak_mb':>8}")
+    for size, stages in results.items():
+        for stage, m in stages.items():
+            print(f"{size:<8} {stage:<30} {m['wall_s']:>8.3f} {m['requests']:>9} {m['peak_mb']:>8.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet; run with --update-baseline to record one.")
+        return
+    with open(args.baseline) as f:
+        problems = compare(results, json.load(f), args.time_tolerance, args.mem_tolerance)
+    if problems:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(problems))
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the NASDAQ option-chain API.
+
+Serves /api/quote/<ticker>/option-chain (chain pages, or per-contract detail
+when recordID is given) from recorded fixtures and/or a SyntheticUniverse, with
+configurable latency, a server-side rate limit that answers 429, and random
+429 injection. Point the screener at it by setting NASDAQ_BASE to .base_url.
+
+python benchmarks/standin.py serve --port 8800 --tickers 50 --latency-ms 40 --max-rps 20 --p429 0.02
+python benchmarks/standin.py record --tickers AAPL,QQQ --fromdate 2025-10-01 --todate 2027-12-31
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit, parse_qsl
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from synthetic import SyntheticUniverse  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class StandIn:
+    """
+    Threaded HTTP stand-in. Fixture tickers (fixtures/<TICKER>/chain.json and
+    fixtures/<TICKER>/detail/<recordID>.json) are replayed verbatim; anything
+    else is answered from `universe`.
+    """
+
+    def __init__(self, universe: Optional[SyntheticUniverse] = None, fixtures_dir: str = FIXTURES_DIR,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, max_rps: float = 0.0,
+                 p429: float = 0.0, retry_after: str = "1", seed: int = 0):
+        self.universe = universe or SyntheticUniverse()
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_rps = max_rps
+        self.p429 = p429
+        self.retry_after = retry_after
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = max_rps
+        self._last = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- lifecycle ----
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "StandIn":
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, body, headers = standin.handle(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    # ---- request handling ----
+    def _throttled(self) -> bool:
+        with self._lock:
+            if self.p429 and self._rng.random() < self.p429:
+                self.counts["429_injected"] += 1
+                return True
+            if self.max_rps <= 0:
+                return False
+            now = time.monotonic()
+            self._tokens = min(self.max_rps, self._tokens + (now - self._last) * self.max_rps)
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return False
+            self.counts["429_rate_limited"] += 1
+            return True
+
+    def handle(self, path: str):
+        parts = urlsplit(path)
+        params = dict(parse_qsl(parts.query))
+        segs = [s for s in parts.path.split("/") if s]
+        endpoint = "detail" if "recordID" in params else "chain"
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[endpoint] += 1
+        if self.latency_ms or self.jitter_ms:
+            time.sleep(max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0)
+        if self._throttled():
+            return 429, {"message": "Too Many Requests"}, {"Retry-After": self.retry_after}
+        if len(segs) != 4 or segs[:2] != ["api", "quote"] or segs[3] != "option-chain":
+            return 404, {"message": "not found"}, {}
+
+        ticker = segs[2].upper()
+        fixture = os.path.join(self.fixtures_dir, ticker)
+        if os.path.isdir(fixture):
+            name = os.path.join("detail", f"{params['recordID']}.json") if endpoint == "detail" else "chain.json"
+            try:
+                with open(os.path.join(fixture, name)) as f:
+                    return 200, json.load(f), {}
+            except FileNotFoundError:
+                return 200, {"data": None, "message": "Record not found"}, {}
+
+        chain = self.universe.chain(ticker)
+        if chain is None:
+            return 200, {"data": None, "message": None}, {}
+        if endpoint == "detail":
+            return 200, chain.detail_payload(params["recordID"]), {}
+        return 200, chain.chain_payload(params), {}
+
+
+def record(tickers, fromdate: str, todate: str, details: int, out_dir: str):
+    """Capture live NASDAQ responses as fixtures (needs network access)."""
+    import pmcc_multi_screener as pmcc
+    for t in tickers:
+        rows, spot, assetclass = pmcc.fetch_chain_rows(t, fromdate, todate, money="all")
+        os.makedirs(os.path.join(out_dir, t, "detail"), exist_ok=True)
+        with open(os.path.join(out_dir, t, "chain.json"), "w") as f:
+            json.dump({"data": {"totalRecord": sum(1 for r in rows if not r.get("expirygroup")),
+                                "lastTrade": f"LAST TRADE: ${spot}", "table": {"rows": rows}}}, f)
+        paths = [r["drillDownURL"] for r in rows if r.get("drillDownURL")][:details]
+        for p in paths:
+            rid = p.rstrip("/").rsplit("/", 1)[-1]
+            js = pmcc.fetch_json(f"{pmcc.NASDAQ_BASE}/api/quote/{t.lower()}/option-chain",
+                                 params={"assetclass": assetclass, "recordID": rid})
+            with open(os.path.join(out_dir, t, "detail", f"{rid}.json"), "w") as f:
+                json.dump(js, f)
+        print(f"{t}: recorded {len(rows)} rows, {len(paths)} detail responses")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local NASDAQ option-chain API stand-in")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="Run the stand-in server")
+    s.add_argument("--port", type=int, default=8800)
+    s.add_argument("--tickers", type=int, default=50, help="Synthetic universe size (S0000...)")
+    s.add_argument("--expiries", type=int, default=20)
+    s.add_argument("--strikes", type=int, default=100, help="Strikes per expiry")
+    s.add_argument("--latency-ms", type=float, default=0.0)
+    s.add_argument("--jitter-ms", type=float, default=0.0)
+    s.add_argument("--max-rps", type=float, default=0.0, help="Answer 429 beyond this rate (0 = unlimited)")
+    s.add_argument("--p429", type=float, default=0.0, help="Probability of an injected 429 per request")
+    s.add_argument("--fixtures", type=str, default=FIXTURES_DIR)
+    r = sub.add_parser("record", help="Record live NASDAQ responses as fixtures")
+    r.add_argument("--tickers", type=str, required=True)
+    r.add_argument("--fromdate", type=str, required=True)
+    r.add_argument("--todate", type=str, required=True)
+    r.add_argument("--details", type=int, default=20, help="Detail responses to record per ticker")
+    r.add_argument("--out", type=str, default=FIXTURES_DIR)
+    args = ap.parse_args()
+
+    if args.cmd == "record":
+        record([t.strip().upper() for t in args.tickers.split(",") if t.strip()],
+               args.fromdate, args.todate, args.details, args.out)
+        return
+
+    standin = StandIn(SyntheticUniverse(args.tickers, args.expiries, args.strikes), fixtures_dir=args.fixtures,
+                      latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, max_rps=args.max_rps, p429=args.p429)
+    standin.start(port=args.port)
+    print(f"Stand-in listening on {standin.base_url} (tickers S0000-S{args.tickers - 1:04d})")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        print(dict(standin.counts))
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Synthetic NASDAQ-shaped option-chain payloads for benchmarks.
+
+Rows mimic api/quote/<ticker>/option-chain: an `expirygroup` header row per
+expiry followed by its contracts, with money/count fields as display strings.
+Quotes are Black-Scholes prices off a simple smile, and the per-contract detail
+payloads carry the matching Greeks, so a screen over synthetic data behaves
+like one over real chains.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pmcc_pricing import call_greeks, call_price  # noqa: E402
+
+import pandas as pd  # noqa: E402
+
+RATE = 0.04
+
+
+def expiry_dates(n_expiries: int, now: Optional[datetime] = None) -> List[datetime]:
+    """Weeklies for the first month, monthlies out to ~7 months, then quarterlies (LEAPS)."""
+    now = now or datetime.utcnow()
+    days = []
+    d = 7
+    while len(days) < n_expiries:
+        days.append(d)
+        d += 7 if d < 35 else (30 if d < 215 else 90)
+    return [(now + timedelta(days=x)).replace(hour=0, minute=0, second=0, microsecond=0) for x in days]
+
+
+def expiry_label(dt: datetime) -> str:
+    return f"{dt:%B} {dt.day}, {dt.year}"
+
+
+class SyntheticChain:
+    """One ticker's call chain, held column-wise (one entry per contract)."""
+
+    def __init__(self, ticker: str, spot: float = 100.0, n_expiries: int = 20, strikes_per_expiry: int = 100,
+                 assetclass: str = "stocks", now: Optional[datetime] = None, seed: int = 0):
+        self.ticker = ticker.upper()
+        self.spot = float(spot)
+        self.assetclass = assetclass
+        now = now or datetime.utcnow()
+        rng = np.random.default_rng(seed)
+        strikes = np.round(np.linspace(spot * 0.3, spot * 1.7, strikes_per_expiry) * 2) / 2
+        expiries = expiry_dates(n_expiries, now)
+
+        n = len(expiries) * len(strikes)
+        self.expiry = np.repeat(np.array(expiries, dtype="datetime64[s]"), len(strikes))
+        self.labels = np.repeat(np.array([expiry_label(e) for e in expiries], dtype=object), len(strikes))
+        self.strike = np.tile(strikes, len(expiries))
+        days = np.repeat(np.array([(e - now).days for e in expiries], dtype=np.float64), len(strikes))
+        self.T = np.maximum(days + 0.8, 0.5) / 365.0
+        self.sigma = 0.30 + 0.15 * np.abs(np.log(self.strike / spot)) + rng.normal(0, 0.005, n)
+        self.price = call_price(spot, self.strike, self.T, RATE, 0.0, self.sigma)
+        self.half_spread = np.maximum(self.price * 0.01, 0.01)
+        self.volume = rng.integers(0, 5000, n)
+        self.oi = rng.integers(0, 50000, n)
+        self.record_ids = np.array([f"{self.ticker.lower()}--{e.astype(datetime):%y%m%d}c{int(round(k * 1000)):08d}"
+                                    for e, k in zip(self.expiry, self.strike)], dtype=object)
+        self._by_record = {r: i for i, r in enumerate(self.record_ids)}
+
+    def __len__(self):
+        return len(self.strike)
+
+    def rows(self, mask: Optional[np.ndarray] = None, offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """Table rows for the selected contracts, paged by contract count like the real endpoint."""
+        idx = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+        idx = idx[offset:offset + limit] if limit is not None else idx[offset:]
+        rows, last_label = [], None
+        for i in idx:
+            if self.labels[i] != last_label:
+                last_label = self.labels[i]
+                rows.append({"expirygroup": last_label})
+            p, h, v = self.price[i], self.half_spread[i], self.volume[i]
+            rows.append({
+                "expirygroup": "",
+                "expiryDate": None,
+                "strike": f"{self.strike[i]:,.2f}",
+                "c_Last": f"{p:,.2f}" if v else "--",
+                "c_Change": "--",
+                "c_Bid": f"{max(p - h, 0):,.2f}",
+                "c_Ask": f"{p + h:,.2f}",
+                "c_Volume": f"{v:,}" if v else "--",
+                "c_Openinterest": f"{self.oi[i]:,}",
+                "drillDownURL": f"/market-activity/{self.assetclass}/{self.ticker.lower()}"
+                                f"/option-chain/call-put-options/{self.record_ids[i]}",
+            })
+        return rows
+
+    def chain_payload(self, params: Dict[str, str]) -> dict:
+        """Response body for an option-chain request (fromdate/todate/money/offset/limit/assetclass)."""
+        if params.get("assetclass", "stocks") != self.assetclass:
+            return {"data": None, "message": None, "status": {"rCode": 200}}
+        mask = np.ones(len(self), dtype=bool)
+        if params.get("fromdate"):
+            mask &= self.expiry >= np.datetime64(params["fromdate"])
+        if params.get("todate"):
+            mask &= self.expiry <= np.datetime64(params["todate"])
+        if params.get("money") == "in":
+            mask &= self.strike <= self.spot
+        elif params.get("money") == "out":
+            mask &= self.strike > self.spot
+        total = int(mask.sum())
+        rows = self.rows(mask, offset=int(params.get("offset", 0)), limit=int(params.get("limit", 500)))
+        return {"data": {
+            "totalRecord": total,
+            "lastTrade": f"LAST TRADE: ${self.spot:,.2f} (AS OF {datetime.utcnow():%b %d, %Y})".upper(),
+            "table": {"headers": {}, "rows": rows},
+        }, "message": None, "status": {"rCode": 200}}
+
+    def detail_payload(self, record_id: str) -> dict:
+        i = self._by_record.get(record_id)
+        if i is None:
+            return {"data": None, "message": "Record not found", "status": {"rCode": 400}}
+        g = call_greeks(self.spot, self.strike[i], self.T[i], RATE, 0.0, self.sigma[i])
+        value = lambda v: {"label": "", "value": f"{float(v):.4f}"}
+        return {"data": {"optionChainCallData": {"optionChainGreeksList": {
+            "Delta": value(g["delta"]), "Gamma": value(g["gamma"]), "Rho": value(0.0),
+            "Theta": value(g["theta"]), "Vega": value(g["vega"]), "Impvol": value(self.sigma[i]),
+        }}}, "message": None, "status": {"rCode": 200}}
+
+
+def make_chain_rows(ticker: str, spot: float = 100.0, n_expiries: int = 20, strikes_per_expiry: int = 100,
+                    assetclass: str = "stocks", now: Optional[datetime] = None, seed: int = 0) -> List[dict]:
+    """Rows for one ticker's call chain."""
+    return SyntheticChain(ticker, spot, n_expiries, strikes_per_expiry, assetclass, now, seed).rows()
+
+
+class SyntheticUniverse:
+    """
+    Any number of synthetic tickers (S0000, S0001, ...; every `etf_every`-th one
+    is an ETF), built lazily so large universes only cost what is requested.
+    """
+
+    def __init__(self, n_tickers: int = 10, n_expiries: int = 20, strikes_per_expiry: int = 100,
+                 etf_every: int = 5, seed: int = 0):
+        self.tickers = [f"S{i:04d}" for i in range(n_tickers)]
+        self.n_expiries = n_expiries
+        self.strikes_per_expiry = strikes_per_expiry
+        self.etf_every = etf_every
+        self.seed = seed
+        self.now = datetime.utcnow()
+        self._chains: Dict[str, SyntheticChain] = {}
+
+    def chain(self, ticker: str) -> Optional[SyntheticChain]:
+        ticker = ticker.upper()
+        if ticker not in self._chains:
+            if ticker not in self.tickers:
+                return None
+            i = self.tickers.index(ticker)
+            self._chains[ticker] = SyntheticChain(
+                ticker, spot=20.0 + 10.0 * (i % 40), n_expiries=self.n_expiries,
+                strikes_per_expiry=self.strikes_per_expiry,
+                assetclass="etf" if self.etf_every and i % self.etf_every == self.etf_every - 1 else "stocks",
+                now=self.now, seed=self.seed + i)
+        return self._chains[ticker]
+
+
+def monthly_expiries(start: datetime, end: datetime) -> List[datetime]:
+    """Third Friday of every month in [start, end]."""
+    out, y, m = [], start.year, start.month
+    while datetime(y, m, 1) <= end:
+        first = datetime(y, m, 1)
+        third = first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+        if start <= third <= end:
+            out.append(third)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def history_frames(ticker: str, start: datetime, n_days: int, spot0: float = 100.0, n_strikes: int = 60,
+                   leaps_min_days: int = 365, leaps_max_days: int = 900, short_days=(20, 60), seed: int = 0):
+    """
+    Yield (snapshot_time, frame) for `n_days` business days of one ticker, in the
+    archive layout: a LEAPS leg (in the money, >= leaps_min_days) and a short leg
+    (out of the money, within short_days) on a fixed expiry calendar (weeklies
+    near term, monthlies beyond), priced off a random-walk spot.
+    """
+    rng = np.random.default_rng(seed)
+    strikes = np.unique(np.round(np.linspace(spot0 * 0.3, spot0 * 2.0, n_strikes) * 2) / 2)
+    end = start + timedelta(days=int(n_days * 1.5) + leaps_max_days)
+    monthlies = set(monthly_expiries(start, end))
+    fridays = [start + timedelta(days=(4 - start.weekday()) % 7 + 7 * i) for i in range((end - start).days // 7)]
+    spot, day, done = spot0, start, 0
+    while done < n_days:
+        if day.weekday() < 5:
+            dtes = {e: (e - day).days for e in fridays}
+            expiries = [e for e, d in dtes.items() if 0 < d <= leaps_max_days and (e in monthlies or d <= short_days[1])]
+            e = np.repeat(np.array(expiries, dtype="datetime64[s]"), len(strikes))
+            dte = np.repeat(np.array([dtes[x] for x in expiries]), len(strikes))
+            k = np.tile(strikes, len(expiries))
+            leaps = (dte >= leaps_min_days) & (k <= spot)
+            short = (dte >= short_days[0]) & (dte <= short_days[1]) & (k > spot)
+            keep = leaps | short
+            e, dte, k, leg = e[keep], dte[keep], k[keep], np.where(leaps[keep], "leaps", "short")
+            T = (dte + 0.8) / 365.0
+            sigma = 0.30 + 0.15 * np.abs(np.log(k / spot)) + rng.normal(0, 0.005, len(k))
+            mid = np.round(call_price(spot, k, T, RATE, 0.0, sigma), 2)
+            half = np.maximum(np.round(mid * 0.01, 2), 0.01)
+            g = call_greeks(spot, k, T, RATE, 0.0, sigma)
+            labels = np.array([expiry_label(x.astype(datetime)) for x in e], dtype=object)
+            yield day.replace(hour=20), pd.DataFrame({
+                "leg": leg, "expiryDate": labels, "expiry": e, "dte": dte, "strike": k,
+                "bid": np.maximum(mid - half, 0.0), "ask": mid + half, "last": mid, "mid": mid,
+                "volume": rng.integers(0, 5000, len(k)), "openInterest": rng.integers(0, 50000, len(k)),
+                "detail_path": [f"/{ticker.lower()}/{lab}/{x}" for lab, x in zip(labels, k)],
+                "delta": np.round(g["delta"], 4), "gamma": np.round(g["gamma"], 4), "theta": np.round(g["theta"], 4),
+                "vega": np.round(g["vega"], 4), "iv": np.round(sigma, 4), "spot": spot,
+            })
+            spot = round(spot * float(np.exp(rng.normal(0.0003, 0.3 / np.sqrt(252)))), 2)
+            done += 1
+        day += timedelta(days=1)
+
+
+def write_history(archive, n_tickers: int, start: datetime, n_days: int, n_strikes: int = 60, seed: int = 0):
+    """Fill a ChainArchive with synthetic daily snapshots for tickers H0000, H0001, ..."""
+    tickers = [f"H{i:04d}" for i in range(n_tickers)]
+    for i, t in enumerate(tickers):
+        for at, frame in history_frames(t, start, n_days, spot0=20.0 + 10.0 * (i % 40), n_strikes=n_strikes,
+                                        seed=seed + i):
+            archive.write(t, frame, at)
+    return tickers
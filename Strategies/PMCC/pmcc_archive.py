@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Parquet archive of enriched option-chain snapshots.
+
+Layout (hive partitions, times in UTC):
+  <root>/ticker=TSLA/date=2025-10-17/time=143005/part-0.parquet
+
+Each file holds one ticker's enriched LEAPS and short windows from one chain
+fetch (a `leg` column tells them apart), stored with compact dtypes and sorted
+by leg, expiry and strike so Parquet row-group statistics let readers skip
+data by expiry, strike and delta. Needs pyarrow.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:   # only the archive needs it
+    pa = ds = pq = None
+
+FLOAT32_COLS = ("strike", "bid", "ask", "last", "mid", "spot", "delta", "gamma", "theta", "vega", "iv")
+INT32_COLS = ("volume", "openInterest")
+CATEGORY_COLS = ("leg", "expiryDate")
+PARTITIONS = ("ticker", "date", "time")
+ROW_GROUP_ROWS = 2048
+TIME_FORMAT = "%H%M%S"
+
+Range = Tuple[Optional[object], Optional[object]]
+
+
+def _require():
+    if pa is None:
+        raise RuntimeError("the chain archive needs pyarrow (python -m pip install pyarrow)")
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Archive dtypes: float32 prices/Greeks, int32 counts, int16 dte, categorical labels."""
+    out = df.copy()
+    for col in FLOAT32_COLS:
+        if col in out.columns:
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype(np.float32)
+    for col in INT32_COLS:
+        if col in out.columns:
+            out[col] = pd.to_numeric(out[col], errors="coerce").fillna(0).astype(np.int32)
+    if "dte" in out.columns:
+        out["dte"] = out["dte"].astype("Int16")
+    for col in CATEGORY_COLS:
+        if col in out.columns:
+            out[col] = out[col].astype(str).astype("category")
+    if "expiry" in out.columns:
+        out["expiry"] = pd.to_datetime(out["expiry"]).astype("datetime64[s]")
+    if "detail_path" in out.columns:
+        out["detail_path"] = out["detail_path"].astype("string")
+    sort = [c for c in ("leg", "expiry", "strike") if c in out.columns]
+    return out.sort_values(sort, kind="stable").reset_index(drop=True) if sort else out
+
+
+def _scalar(value, arrow_type):
+    if pa.types.is_timestamp(arrow_type):
+        return pa.scalar(pd.Timestamp(value).to_pydatetime(), type=arrow_type)
+    return pa.scalar(value, type=arrow_type)
+
+
+def range_filter(schema, ranges: Optional[Dict[str, Range]] = None, legs: Optional[Sequence[str]] = None):
+    """Dataset expression for inclusive (lo, hi) ranges per column (None = open end) and a leg subset."""
+    expr = None
+    def both(e):
+        return e if expr is None else expr & e
+    for col, (lo, hi) in (ranges or {}).items():
+        typ = schema.field(col).type
+        if lo is not None:
+            expr = both(ds.field(col) >= _scalar(lo, typ))
+        if hi is not None:
+            expr = both(ds.field(col) <= _scalar(hi, typ))
+    if legs:
+        expr = both(ds.field("leg").isin(list(legs)))
+    return expr
+
+
+class ChainArchive:
+    """Writer and reader for one archive root directory."""
+
+    def __init__(self, root: str):
+        _require()
+        self.root = root
+
+    def partition(self, ticker: str, at: datetime) -> str:
+        return os.path.join(self.root, f"ticker={ticker.upper()}", f"date={at:%Y-%m-%d}",
+                            f"time={at.strftime(TIME_FORMAT)}")
+
+    def write(self, ticker: str, df: pd.DataFrame, at: datetime) -> str:
+        """Store one snapshot (an `expiry` datetime column is needed for pushdown) and return its path."""
+        table = pa.Table.from_pandas(compact(df), preserve_index=False)
+        folder = self.partition(ticker, at)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "part-0.parquet")
+        tmp = f"{path}.tmp"
+        pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS, compression="zstd")
+        os.replace(tmp, path)
+        return path
+
+    # ---- reading ----
+    def snapshots(self, ticker: str) -> List[datetime]:
+        """Snapshot times stored for a ticker, oldest first."""
+        base = os.path.join(self.root, f"ticker={ticker.upper()}")
+        out = []
+        for day in (os.listdir(base) if os.path.isdir(base) else []):
+            for t in os.listdir(os.path.join(base, day)):
+                if day.startswith("date=") and t.startswith("time="):
+                    out.append(datetime.strptime(f"{day[5:]} {t[5:]}", f"%Y-%m-%d {TIME_FORMAT}"))
+        return sorted(out)
+
+    def latest(self, ticker: str, as_of: Optional[datetime] = None) -> Optional[datetime]:
+        """The newest snapshot taken at or before `as_of` (default: the newest overall)."""
+        snaps = [s for s in self.snapshots(ticker) if as_of is None or s <= as_of]
+        return snaps[-1] if snaps else None
+
+    def load(self, ticker: str, at: datetime, columns: Optional[List[str]] = None,
+             ranges: Optional[Dict[str, Range]] = None, legs: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        One snapshot, reading only `columns` and the row groups that can match
+        `ranges` ({"expiry": (lo, hi), "strike": ..., "delta": ...}) and `legs`.
+        """
+        path = os.path.join(self.partition(ticker, at), "part-0.parquet")
+        dataset = ds.dataset(path, format="parquet")
+        return dataset.to_table(columns=columns, filter=range_filter(dataset.schema, ranges, legs)).to_pandas()
+
+    def scan(self, tickers: Optional[Sequence[str]] = None, date_from: Optional[str] = None,
+             date_to: Optional[str] = None, columns: Optional[List[str]] = None,
+             ranges: Optional[Dict[str, Range]] = None, legs: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Many snapshots at once; partitions outside `tickers` / [date_from, date_to]
+        are never opened. The ticker, date and time partition columns are
+        included (as strings) when `columns` asks for them or is None.
+        """
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=columns)
+        partitioning = ds.partitioning(pa.schema([(p, pa.string()) for p in PARTITIONS]), flavor="hive")
+        dataset = ds.dataset(self.root, format="parquet", partitioning=partitioning)
+        expr = range_filter(dataset.schema, ranges, legs)
+        parts = []
+        if tickers:
+            parts.append(ds.field("ticker").isin([t.upper() for t in tickers]))
+        if date_from:
+            parts.append(ds.field("date") >= date_from)
+        if date_to:
+            parts.append(ds.field("date") <= date_to)
+        for p in parts:
+            expr = p if expr is None else expr & p
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+PMCC backtester over a Parquet chain archive (see pmcc_archive.py / --archive).
+
+Replays the last snapshot of each day. Tickers without a position open the
+best combo under the screener's own rules (filter_rank_leaps/filter_rank_shorts,
+combos_for_ticker, --sort key). Every open position is then marked to market
+each day, all positions at once:
+  - a short that reaches expiry is closed at intrinsic value, plus
+    early_close_buffer when it finishes in the money, and a new short is sold
+    against the same LEAPS (the best short passing the short rules whose strike
+    is above the LEAPS strike and clears min_cushion_pct)
+  - the LEAPS is sold (with any open short bought back) once it has fewer than
+    leaps_exit_days left, and everything is closed on the last day
+Quotes missing from a snapshot (e.g. a LEAPS that left the archived in-the-money
+window) keep their last mark; a missing short is marked at intrinsic once in
+the money. P&L is in $ per spread (one contract each leg).
+
+python pmcc_backtest.py --archive archive/ --from 2025-01-01 --to 2025-12-31
+python pmcc_backtest.py --archive archive/ --sweep target_leaps_delta_low=0.7,0.75,0.8 \\
+    --sweep short_delta_high=0.3,0.4 --set max_leaps_iv=1.5 --workers 8 --out sweep.csv
+"""
+
+import os
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pmcc_archive import ChainArchive
+from pmcc_scenarios import ScenarioConfig, add_scenario_columns
+from pmcc_multi_screener import (PMCCSelectionConfig, F32_DECIMALS, filter_rank_leaps, filter_rank_shorts,
+                                 combos_for_ticker, sort_combos, cast_field)
+
+BACKTEST_COLUMNS = ["ticker", "date", "time", "leg", "expiryDate", "expiry", "strike", "bid", "ask", "mid",
+                    "volume", "openInterest", "delta", "iv", "spot"]
+BOOK_COLUMNS = ["ticker", "opened", "spot", "debit", "cash", "rolls",
+                "leap_label", "leap_expiry", "leap_strike", "leap_mark",
+                "short_label", "short_expiry", "short_strike", "short_mark"]
+
+
+@dataclass
+class BacktestConfig:
+    leaps_max_days: int = 900     # LEAPS window is min_days_to_expiry..leaps_max_days
+    leaps_exit_days: int = 60     # sell the LEAPS once fewer days than this remain
+    top_n_leaps: int = 8
+    top_n_shorts: int = 10
+    sort_key: str = "metric2"
+
+
+# ---------------------------
+# Data
+# ---------------------------
+def load_days(archive: ChainArchive, tickers: Optional[Sequence[str]] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Tuple[pd.Timestamp, pd.DataFrame]]:
+    """The last snapshot per ticker and day, as (day, frame) sorted by day, with dte relative to that day."""
+    df = archive.scan(tickers, date_from, date_to, columns=BACKTEST_COLUMNS)
+    if df.empty:
+        return []
+    df = df[df["time"] == df.groupby(["ticker", "date"])["time"].transform("max")]
+    df = df.assign(ticker=df["ticker"].astype(str), leg=df["leg"].astype(str), expiryDate=df["expiryDate"].astype(str),
+                   expiry=pd.to_datetime(df["expiry"]).dt.normalize())
+    for col in ("strike", "bid", "ask", "mid", "delta", "iv", "spot"):
+        # float32 in the archive; same rounding as the screener's combo math
+        df[col] = df[col].astype("float64").round(F32_DECIMALS)
+    days = []
+    for d, g in df.groupby("date", sort=True):
+        day = pd.Timestamp(d)
+        g = g.drop(columns=["date", "time"]).reset_index(drop=True)
+        g["dte"] = (g["expiry"] - day).dt.days.astype("int32")
+        days.append((day, g))
+    return days
+
+
+# ---------------------------
+# Selection (the screener's rules, per ticker)
+# ---------------------------
+def _windows(snap: pd.DataFrame, cfg: PMCCSelectionConfig, bt: BacktestConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    leaps = snap[(snap["leg"] == "leaps") & snap["dte"].between(cfg.min_days_to_expiry, bt.leaps_max_days)]
+    shorts = snap[(snap["leg"] == "short") & snap["dte"].between(cfg.short_min_days, cfg.short_max_days)]
+    return leaps, shorts
+
+
+def open_positions(snap: pd.DataFrame, tickers: Sequence[str], day: pd.Timestamp,
+                   cfg: PMCCSelectionConfig, bt: BacktestConfig) -> pd.DataFrame:
+    """New book rows: the top combo of each ticker in `tickers`."""
+    leaps, shorts = _windows(snap[snap["ticker"].isin(tickers)], cfg, bt)
+    shorts_by_ticker = dict(tuple(shorts.groupby("ticker", sort=False)))
+    rows = []
+    for t, lg in leaps.groupby("ticker", sort=False):
+        sg = shorts_by_ticker.get(t)
+        if sg is None:
+            continue
+        lg = filter_rank_leaps(lg, cfg, bt.top_n_leaps)
+        sg = filter_rank_shorts(sg, cfg, bt.top_n_shorts, float(sg["spot"].iloc[0]))
+        if lg.empty or sg.empty:
+            continue
+        combos = combos_for_ticker(lg, sg, cfg.early_close_buffer, cfg.min_cushion_pct)
+        if combos.empty:
+            continue
+        if bt.sort_key == "risk":
+            combos = add_scenario_columns(combos, ScenarioConfig(), cfg.early_close_buffer)
+        rows.append(sort_combos(combos, bt.sort_key).iloc[0])
+    if not rows:
+        return pd.DataFrame(columns=BOOK_COLUMNS)
+    best = pd.DataFrame(rows)
+    expiry = snap.drop_duplicates(["ticker", "expiryDate"]).set_index(["ticker", "expiryDate"])["expiry"]
+    book = pd.DataFrame({
+        "ticker": best["ticker"].to_numpy(), "opened": day, "spot": best["spot"].to_numpy(float),
+        "leap_label": best["leap_expiry"].to_numpy(), "leap_strike": best["leap_strike"].to_numpy(float),
+        "leap_mark": best["leap_mid"].to_numpy(float),
+        "short_label": best["short_expiry"].to_numpy(), "short_strike": best["short_strike"].to_numpy(float),
+        "short_mark": best["short_mid"].to_numpy(float),
+    })
+    book["leap_expiry"] = expiry.reindex(pd.MultiIndex.from_arrays([book["ticker"], book["leap_label"]])).to_numpy()
+    book["short_expiry"] = expiry.reindex(pd.MultiIndex.from_arrays([book["ticker"], book["short_label"]])).to_numpy()
+    book["debit"] = book["leap_mark"] - book["short_mark"]
+    book["cash"] = -book["debit"]
+    book["rolls"] = 0
+    return book[BOOK_COLUMNS]
+
+
+def roll_shorts(book: pd.DataFrame, snap: pd.DataFrame, cfg: PMCCSelectionConfig, bt: BacktestConfig) -> np.ndarray:
+    """Sell a new short for every position without one; returns the mask of positions that rolled."""
+    need = book["short_label"].isna().to_numpy()
+    if not need.any():
+        return need
+    _, shorts = _windows(snap[snap["ticker"].isin(book.loc[need, "ticker"])], cfg, bt)
+    # ranked per ticker, against that ticker's spot
+    ranked = [filter_rank_shorts(g, cfg, bt.top_n_shorts, float(g["spot"].iloc[0]))
+              for _, g in shorts.groupby("ticker", sort=False)]
+    shorts = pd.concat(ranked) if ranked else shorts
+    if shorts.empty:
+        return np.zeros(len(book), dtype=bool)
+    pos = book.loc[need, ["ticker", "leap_strike", "leap_expiry", "spot"]].reset_index()
+    cand = pos.merge(shorts[["ticker", "expiryDate", "expiry", "strike", "mid"]], on="ticker")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cushion = (cand["strike"] - cand["spot"]) / cand["spot"] * 100.0
+    cand = cand[(cand["strike"] > cand["leap_strike"]) & (cand["expiry"] < cand["leap_expiry"])
+                & (cand["mid"] > 0) & (cushion > cfg.min_cushion_pct)]
+    pick = cand.drop_duplicates("index").set_index("index")   # shorts are already ranked best first
+    idx = pick.index.to_numpy()
+    book.loc[idx, "short_label"] = pick["expiryDate"]
+    book.loc[idx, "short_expiry"] = pick["expiry"]
+    book.loc[idx, "short_strike"] = pick["strike"]
+    book.loc[idx, "short_mark"] = pick["mid"]
+    book.loc[idx, "cash"] += pick["mid"]
+    book.loc[idx, "rolls"] += 1
+    return book.index.isin(idx)
+
+
+# ---------------------------
+# Marking and closing (vectorized over the whole book)
+# ---------------------------
+def _quotes(book: pd.DataFrame, snap: pd.DataFrame, label: str, strike: str) -> np.ndarray:
+    quotes = snap.drop_duplicates(["ticker", "expiryDate", "strike"])[["ticker", "expiryDate", "strike", "mid"]]
+    keyed = book[["ticker", label, strike]].rename(columns={label: "expiryDate", strike: "strike"})
+    return keyed.merge(quotes, on=["ticker", "expiryDate", "strike"], how="left")["mid"].to_numpy(float)
+
+
+def mark(book: pd.DataFrame, snap: pd.DataFrame):
+    """Update spot and both legs' marks in place from today's snapshot."""
+    spot = book["ticker"].map(snap.groupby("ticker")["spot"].first()).to_numpy(float)
+    book["spot"] = np.where(np.isnan(spot), book["spot"].to_numpy(float), spot)
+    leap = _quotes(book, snap, "leap_label", "leap_strike")
+    book["leap_mark"] = np.where(np.isnan(leap), book["leap_mark"].to_numpy(float), leap)
+    short = _quotes(book, snap, "short_label", "short_strike")
+    intrinsic = np.maximum(book["spot"].to_numpy(float) - book["short_strike"].to_numpy(float), 0.0)
+    prev = book["short_mark"].to_numpy(float)
+    book["short_mark"] = np.where(~np.isnan(short), short, np.where(intrinsic > 0, intrinsic, prev))
+
+
+def _short_close_cost(book: pd.DataFrame, buffer: float) -> np.ndarray:
+    """Per-share cost to buy back each open short now (intrinsic at expiry, mark before; + buffer when ITM)."""
+    intrinsic = np.maximum(book["spot"].to_numpy(float) - book["short_strike"].to_numpy(float), 0.0)
+    return np.where(book["short_label"].isna(), 0.0,
+                    np.maximum(book["short_mark"].to_numpy(float), intrinsic) + np.where(intrinsic > 0, buffer, 0.0))
+
+
+def expire_shorts(book: pd.DataFrame, day: pd.Timestamp, buffer: float) -> Tuple[int, int]:
+    """Settle shorts at or past expiry; returns (closed in the money, expired worthless)."""
+    due = (book["short_label"].notna() & (book["short_expiry"] <= day)).to_numpy()
+    if not due.any():
+        return 0, 0
+    intrinsic = np.maximum(book["spot"].to_numpy(float) - book["short_strike"].to_numpy(float), 0.0)
+    cost = intrinsic + np.where(intrinsic > 0, buffer, 0.0)
+    book.loc[due, "cash"] -= cost[due]
+    for col in ("short_label", "short_expiry", "short_strike", "short_mark"):
+        book.loc[due, col] = None if col in ("short_label", "short_expiry") else np.nan
+    itm = int((due & (intrinsic > 0)).sum())
+    return itm, int(due.sum()) - itm
+
+
+def close(book: pd.DataFrame, mask: np.ndarray, day: pd.Timestamp, buffer: float) -> pd.DataFrame:
+    """Close the masked positions at today's marks; returns them as trades with realized P&L."""
+    trades = book[mask].copy()
+    if trades.empty:
+        return trades
+    proceeds = trades["leap_mark"].to_numpy(float) - _short_close_cost(trades, buffer)
+    trades["closed"] = day
+    trades["pnl"] = (trades["cash"].to_numpy(float) + proceeds) * 100.0
+    trades["return_pct"] = trades["pnl"] / (trades["debit"].to_numpy(float) * 100.0) * 100.0
+    return trades
+
+
+# ---------------------------
+# Engine
+# ---------------------------
+def backtest(days: List[Tuple[pd.Timestamp, pd.DataFrame]], cfg: Optional[PMCCSelectionConfig] = None,
+             bt: Optional[BacktestConfig] = None) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """Run over loaded days; returns (daily equity, trades, summary)."""
+    cfg, bt = cfg or PMCCSelectionConfig(), bt or BacktestConfig()
+    book = pd.DataFrame(columns=BOOK_COLUMNS)
+    trades, curve = [], []
+    realized, itm_closes, expired, rolls = 0.0, 0, 0, 0
+    for n, (day, snap) in enumerate(days):
+        last = n == len(days) - 1
+        if len(book):
+            mark(book, snap)
+            i, e = expire_shorts(book, day, cfg.early_close_buffer)
+            itm_closes, expired = itm_closes + i, expired + e
+            left = (book["leap_expiry"] - day).dt.days.to_numpy()
+            done = (left < bt.leaps_exit_days) | last
+            if done.any():
+                closed = close(book, done, day, cfg.early_close_buffer)
+                realized += float(closed["pnl"].sum())
+                trades.append(closed)
+                book = book[~done].reset_index(drop=True)
+            if len(book) and not last:
+                rolls += int(roll_shorts(book, snap, cfg, bt).sum())
+        if not last:
+            free = sorted(set(snap["ticker"]) - set(book["ticker"]))
+            if free:
+                opened = open_positions(snap, free, day, cfg, bt)
+                if len(opened):
+                    book = pd.concat([book, opened], ignore_index=True) if len(book) else opened
+        unrealized = float(((book["cash"] + book["leap_mark"] - _short_close_cost(book, 0.0)) * 100.0).sum()) \
+            if len(book) else 0.0
+        curve.append({"date": day, "positions": len(book), "realized": realized, "equity": realized + unrealized})
+
+    equity = pd.DataFrame(curve)
+    trades = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame(columns=BOOK_COLUMNS + ["pnl"])
+    eq = equity["equity"].to_numpy(float) if len(equity) else np.zeros(1)
+    summary = {
+        "days": len(days),
+        "trades": len(trades),
+        "total_pnl": round(realized, 2),
+        "win_rate": round(float((trades["pnl"] > 0).mean()), 4) if len(trades) else None,
+        "avg_return_pct": round(float(trades["return_pct"].mean()), 3) if len(trades) else None,
+        "max_drawdown": round(float((np.maximum.accumulate(eq) - eq).max()), 2),
+        "rolls": rolls,
+        "itm_closes": itm_closes,
+        "expired_worthless": expired,
+    }
+    return equity, trades, summary
+
+
+# ---------------------------
+# Parameter sweeps
+# ---------------------------
+_DAYS: List[Tuple[pd.Timestamp, pd.DataFrame]] = []
+
+
+def cast_param(name: str, value, cfg: PMCCSelectionConfig, bt: BacktestConfig):
+    """value (text from the command line, or a Python value) cast for whichever config owns `name`."""
+    owner = type(cfg) if name in {f.name for f in fields(cfg)} else type(bt)
+    return cast_field(owner, name, value)
+
+
+def split_params(params: Dict, cfg: PMCCSelectionConfig, bt: BacktestConfig) -> Tuple[PMCCSelectionConfig, BacktestConfig]:
+    """Apply {field: value} overrides (cast to each field's type) to whichever config owns each field."""
+    params = {k: cast_param(k, v, cfg, bt) for k, v in params.items()}
+    cfg_fields = {f.name for f in fields(cfg)}
+    return (replace(cfg, **{k: v for k, v in params.items() if k in cfg_fields}),
+            replace(bt, **{k: v for k, v in params.items() if k not in cfg_fields}))
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _init_worker(root: str, tickers, date_from, date_to):
+    # each worker process loads the archive once and reuses it for all its configs
+    global _DAYS
+    _DAYS = load_days(ChainArchive(root), tickers, date_from, date_to)
+
+
+def _run_params(job: Tuple[Dict, PMCCSelectionConfig, BacktestConfig]) -> Dict:
+    params, cfg, bt = job
+    cfg, bt = split_params(params, cfg, bt)
+    return backtest(_DAYS, cfg, bt)[2]
+
+
+def sweep(root: str, grid: Dict[str, Sequence], tickers: Optional[Sequence[str]] = None,
+          date_from: Optional[str] = None, date_to: Optional[str] = None,
+          cfg: Optional[PMCCSelectionConfig] = None, bt: Optional[BacktestConfig] = None,
+          workers: Optional[int] = None) -> pd.DataFrame:
+    """Backtest every combination in `grid` on a process pool; one row per configuration, best P&L first."""
+    cfg, bt = cfg or PMCCSelectionConfig(), bt or BacktestConfig()
+    jobs = expand_grid(grid)
+    for params in jobs:
+        split_params(params, cfg, bt)   # fail fast on typos, before starting workers
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(root, tickers, date_from, date_to)) as pool:
+        chunk = max(1, len(jobs) // (workers * 4))
+        results = list(pool.map(_run_params, [(p, cfg, bt) for p in jobs], chunksize=chunk))
+    out = pd.DataFrame([{**p, **r} for p, r in zip(jobs, results)])
+    return out.sort_values("total_pnl", ascending=False).reset_index(drop=True)
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def parse_assignment(text: str, cfg: PMCCSelectionConfig, bt: BacktestConfig) -> Tuple[str, List]:
+    """'name=v1,v2' -> (name, [values]), each cast to the config field's annotated type."""
+    name, _, values = text.partition("=")
+    name = name.strip()
+    if not name or not values.strip():
+        raise ValueError(f"expected <config field>=<value>[,<value>...], got {text!r}")
+    return name, [cast_param(name, v, cfg, bt) for v in values.split(",") if v.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest PMCC selection rules over a Parquet chain archive")
+    ap.add_argument("--archive", type=str, required=True, help="Archive directory written with --archive")
+    ap.add_argument("--tickers", type=str, default="", help="Comma-separated tickers (default: all archived)")
+    ap.add_argument("--from", dest="date_from", type=str, default="", help="First day, YYYY-MM-DD")
+    ap.add_argument("--to", dest="date_to", type=str, default="", help="Last day, YYYY-MM-DD")
+    ap.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                    help="Override a PMCCSelectionConfig/BacktestConfig field (repeatable)")
+    ap.add_argument("--sweep", action="append", default=[], metavar="FIELD=V1,V2,...",
+                    help="Sweep a field over values (repeatable; all combinations are run)")
+    ap.add_argument("--workers", type=int, default=0, help="Sweep processes (default: CPU count)")
+    ap.add_argument("--out", type=str, default="", help="CSV for the trades (single run) or the sweep table")
+    ap.add_argument("--equity-csv", type=str, default="", help="Single run: CSV for the daily equity curve")
+    args = ap.parse_args()
+
+    cfg, bt = PMCCSelectionConfig(), BacktestConfig()
+    try:
+        overrides = dict(parse_assignment(s, cfg, bt) for s in args.set)
+        grid = dict(parse_assignment(s, cfg, bt) for s in args.sweep)
+        cfg, bt = split_params({k: v[0] for k, v in overrides.items()}, cfg, bt)
+    except ValueError as e:
+        ap.error(str(e))
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()] or None
+    date_from, date_to = args.date_from or None, args.date_to or None
+
+    if grid:
+        table = sweep(args.archive, grid, tickers, date_from, date_to, cfg, bt, args.workers or None)
+        print(table.to_string(index=False))
+        if args.out:
+            table.to_csv(args.out, index=False)
+            print(f"Saved sweep to {args.out}")
+        return
+
+    days = load_days(ChainArchive(args.archive), tickers, date_from, date_to)
+    if not days:
+        print("No archived snapshots in that range.")
+        return
+    equity, trades, summary = backtest(days, cfg, bt)
+    print(f"Config: {asdict(cfg)} {asdict(bt)}")
+    for k, v in summary.items():
+        print(f"{k:>18}: {v}")
+    if args.out:
+        trades.to_csv(args.out, index=False)
+        print(f"Saved trades to {args.out}")
+    if args.equity_csv:
+        equity.to_csv(args.equity_csv, index=False)
+        print(f"Saved equity curve to {args.equity_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Export of ranked combos to CSV / Excel without extra full copies.
+
+compact_combos downcasts floats to float32 and the ticker/expiry labels to
+categoricals (about half the memory of the screener's frame). Both writers
+walk the frame in batches of BATCH_ROWS and, with compact=True, compact each
+batch as it is written, so the full frame is never copied: CSV batches are
+appended to one open file, and Excel goes through openpyxl's write-only mode,
+which streams rows to disk instead of building every cell in memory. Excel
+sheets hold at most EXCEL_MAX_ROWS data rows; longer results continue on
+"<sheet> (2)", ...
+"""
+
+import re
+import itertools
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+BATCH_ROWS = 50_000
+EXCEL_MAX_ROWS = 1_048_575          # 1,048,576 rows per sheet, minus the header
+CATEGORY_COLS = ("ticker", "leap_expiry", "short_expiry")
+
+
+def compact_combos(df: pd.DataFrame) -> pd.DataFrame:
+    """float64 -> float32, label columns -> categorical; other columns are left as they are."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in CATEGORY_COLS:
+            out[col] = s.astype("category")
+        elif s.dtype == np.float64:
+            out[col] = s.astype(np.float32)
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def batches(df: pd.DataFrame, rows: int = BATCH_ROWS, compact: bool = False) -> Iterator[pd.DataFrame]:
+    for lo in range(0, len(df), rows):
+        part = df.iloc[lo:lo + rows]
+        yield compact_combos(part) if compact else part
+
+
+def export_csv(df: pd.DataFrame, path: str, batch_rows: int = BATCH_ROWS, compact: bool = False):
+    with open(path, "w", newline="") as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+        for n, part in enumerate(batches(df, batch_rows, compact)):
+            part.to_csv(f, index=False, header=n == 0)
+
+
+def _cells(part: pd.DataFrame) -> Iterator[tuple]:
+    # plain Python values, NaN/NA -> empty cell (openpyxl would write NaN as text Excel rejects)
+    cols = []
+    for col in part.columns:
+        s = part[col]
+        if s.dtype == np.float32:
+            # via the shortest float32 text, so 15.02 is written as 15.02 and not 15.0200004577
+            values = s.to_numpy().astype(str).astype(np.float64).tolist()
+        elif pd.api.types.is_float_dtype(s):
+            values = s.to_numpy(np.float64).tolist()
+        else:
+            values = s.astype(object).to_numpy().tolist()
+        mask = s.isna().to_numpy()
+        if mask.any():
+            values = [None if m else v for v, m in zip(values, mask)]
+        cols.append(values)
+    return zip(*cols)
+
+
+def sheet_name(name: str, used: set) -> str:
+    """Excel-safe, unique sheet name (31 chars, no []:*?/\\)."""
+    base = re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Sheet"
+    out, n = base, 2
+    while out.lower() in used:
+        suffix = f" ({n})"
+        out, n = base[:31 - len(suffix)] + suffix, n + 1
+    used.add(out.lower())
+    return out
+
+
+def _write_sheet(wb, used: set, name: str, df: pd.DataFrame, batch_rows: int, compact: bool = False):
+    header = [str(c) for c in df.columns]
+    ws, rows = None, EXCEL_MAX_ROWS
+    for part in batches(df, batch_rows, compact) if len(df) else [df]:
+        for row in _cells(part):
+            if rows == EXCEL_MAX_ROWS:
+                ws, rows = wb.create_sheet(sheet_name(name, used)), 0
+                ws.append(header)
+            ws.append(row)
+            rows += 1
+    if ws is None:
+        wb.create_sheet(sheet_name(name, used)).append(header)
+
+
+def export_excel(df: pd.DataFrame, path: str, per_ticker: bool = False, sheet: str = "Combos",
+                 batch_rows: int = BATCH_ROWS, max_ticker_sheets: Optional[int] = None, compact: bool = False):
+    """
+    Write-only workbook: the ranked combos on `sheet`, plus (per_ticker) one
+    sheet per ticker in ranking order, each keeping that ticker's rows in rank
+    order. max_ticker_sheets caps how many tickers get their own sheet;
+    compact writes each batch through compact_combos.
+    """
+    from openpyxl import Workbook   # optional; only needed for Excel output
+    wb = Workbook(write_only=True)
+    used: set = set()
+    _write_sheet(wb, used, sheet, df, batch_rows, compact)
+    if per_ticker and "ticker" in df.columns and len(df):
+        # one pass; sort=False keeps the groups in order of first appearance, i.e. ranking order
+        groups = df.groupby("ticker", sort=False, observed=True)
+        for t, rows in itertools.islice(groups, max_ticker_sheets):
+            _write_sheet(wb, used, t, rows, batch_rows, compact)
+    wb.save(path)
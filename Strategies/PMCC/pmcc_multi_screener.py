@@ -31,20 +31,48 @@ python pmcc_multi_screener.py \
 
 for stocks, assetclass=stocks in url
 for ETFs, assetclass=etf in url
+(resolved per ticker by AssetClassResolver and remembered in --assetclass-file)
 """
 
+import os
 import re
+import sys
+import json
 import math
+import logging
+import heapq
+import zlib
+import random
+import sqlite3
 import argparse
+import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional, Dict, Tuple, List
+import cProfile
+import pstats
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime
+from functools import lru_cache, partial
+from typing import Optional, Dict, Tuple, List, Union, get_args, get_origin, get_type_hints
+from urllib.parse import urlsplit, parse_qsl, urlencode
 
 import requests
+import numpy as np
 import pandas as pd
 
-assetclass = "stocks"
+from pmcc_pricing import call_greeks, implied_vol
+from pmcc_archive import ChainArchive
+from pmcc_scoring import LeapsWeights, ShortWeights, parse_weights, top_leaps, top_shorts
+from pmcc_export import compact_combos, export_csv, export_excel
+from pmcc_scenarios import ScenarioConfig, SCENARIO_COLUMNS, add_scenario_columns, save_surface
+
+try:
+    import resource   # peak RSS; not available on Windows
+except ImportError:
+    resource = None
+
 NASDAQ_BASE = "https://api.nasdaq.com"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
@@ -54,27 +82,484 @@ HEADERS = {
     "Origin": "https://www.nasdaq.com",
     "Referer": "https://www.nasdaq.com/",
 }
+GREEK_COLS = ("delta", "gamma", "theta", "vega", "iv")
+GREEKS_MODES = ("remote", "local", "hybrid")
+EXPIRY_CLOSE_DAY_FRACTION = 20 / 24   # expiry labels are dates; options stop at the 4pm ET close (~20:00 UTC)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5     # seconds; doubled per attempt, full jitter
+BACKOFF_CAP = 20.0
+
+log = logging.getLogger("pmcc")
+
+# ---------------------------
+# Rate limiting
+# ---------------------------
+class RateLimiter:
+    """
+    Token bucket shared by every request to NASDAQ.
+    `rate` tokens are added per second up to `burst`; each request takes one.
+    """
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self._lock = threading.Lock()
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate: float, burst: Optional[float] = None):
+        with self._lock:
+            self.rate = max(float(rate), 1e-6)
+            self.burst = float(burst) if burst else max(1.0, self.rate)
+            self._tokens = self.burst
+            self._last = time.monotonic()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+RATE_LIMITER = RateLimiter(rate=2.0)
+# cap on requests in flight across all threads; see set_max_inflight()
+_INFLIGHT = threading.BoundedSemaphore(8)
+_local = threading.local()
+
+def set_max_inflight(n: int):
+    global _INFLIGHT
+    _INFLIGHT = threading.BoundedSemaphore(max(1, n))
+
+# ---------------------------
+# Instrumentation
+# ---------------------------
+# HTTP latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class Metrics:
+    """
+    Thread-safe counters for one screening run: HTTP latency per endpoint,
+    request/retry/failure counts, time per pipeline stage (summed across
+    threads), and per-ticker time and contract counts.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.counters: Dict[str, int] = {}
+            self.http: Dict[str, Dict] = {}
+            self.stages: Dict[str, Dict[str, float]] = {}
+            self.tickers: Dict[str, Dict[str, float]] = {}
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe_http(self, endpoint: str, seconds: float, status: Optional[int]):
+        ms = seconds * 1000.0
+        with self._lock:
+            h = self.http.setdefault(endpoint, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "status": {},
+                                                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)})
+            h["count"] += 1
+            h["total_ms"] += ms
+            h["max_ms"] = max(h["max_ms"], ms)
+            key = str(status) if status is not None else "error"
+            h["status"][key] = h["status"].get(key, 0) + 1
+            h["buckets"][sum(1 for b in LATENCY_BUCKETS_MS if ms > b)] += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            with self._lock:
+                st = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+                st["calls"] += 1
+                st["seconds"] += dt
+
+    def ticker(self, ticker: str, **values: float):
+        """Add to a ticker's numbers (seconds, contracts, greeks_fetched, kept_leaps, ...).
+        greeks_fetched counts detail responses fetched from NASDAQ, not cache or memo hits."""
+        with self._lock:
+            row = self.tickers.setdefault(ticker, {})
+            for k, v in values.items():
+                row[k] = row.get(k, 0) + v
+
+    def report(self) -> dict:
+        with self._lock:
+            labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+            http = {ep: {"count": h["count"],
+                         "mean_ms": round(h["total_ms"] / h["count"], 2) if h["count"] else None,
+                         "max_ms": round(h["max_ms"], 2),
+                         "status": dict(h["status"]),
+                         "histogram_ms": dict(zip(labels, h["buckets"]))}
+                    for ep, h in self.http.items()}
+            tickers = {t: {k: round(v, 3) for k, v in row.items()} for t, row in self.tickers.items()}
+            totals: Dict[str, float] = {}
+            for row in tickers.values():
+                for k, v in row.items():
+                    totals[k] = totals.get(k, 0) + v
+            return {
+                "wall_s": round(time.perf_counter() - self.started, 3),
+                "peak_rss_mb": round(peak_rss_mb(), 1) if resource is not None else None,
+                "counters": dict(self.counters),
+                "http": http,
+                "stages": {k: {"calls": v["calls"], "seconds": round(v["seconds"], 4)} for k, v in self.stages.items()},
+                "tickers": tickers,
+                "totals": totals,
+            }
+
+METRICS = Metrics()
+
+class ThreadProfiler:
+    """
+    cProfile for the calling thread and for every thread started while it runs
+    (the Greeks and ticker pools), merged into one pstats.Stats at stop().
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    def _new(self) -> cProfile.Profile:
+        prof = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(prof)
+        return prof
+
+    def _thread_hook(self, frame, event, arg):
+        # runs once as a new thread's first profile event; the C profiler replaces it
+        self._new().enable()
+
+    def start(self):
+        threading.setprofile(self._thread_hook)
+        self._new().enable()
+
+    def stop(self) -> pstats.Stats:
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self._profiles)
+        for prof in profiles:
+            prof.disable()
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            stats.add(prof)
+        return stats
+
+# ---------------------------
+# Response cache
+# ---------------------------
+# seconds a cached response stays fresh, per endpoint
+CACHE_TTLS = {"chain": 300.0, "detail": 3600.0}
+
+class CacheMiss(RuntimeError):
+    """Raised in offline mode when a response is not in the cache."""
+
+class ResponseCache:
+    """
+    On-disk cache of NASDAQ JSON responses (SQLite, zlib-compressed bodies).
+    Keys are the normalized URL + params; entries expire per endpoint TTL and
+    the least recently used ones are evicted once the store exceeds max_bytes.
+    In offline mode stale entries are still served and misses raise CacheMiss.
+    """
+    def __init__(self, cache_dir: str, ttls: Optional[Dict[str, float]] = None,
+                 max_bytes: int = 256 * 1024 * 1024, offline: bool = False):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite")
+        self.ttls = {**CACHE_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, endpoint TEXT, body BLOB, size INTEGER,"
+            " fetched_at REAL, accessed_at REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None) -> str:
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + [(k, str(v)) for k, v in (params or {}).items()]
+        return f"{parts.scheme}://{parts.netloc.lower()}{parts.path.lower()}?{urlencode(sorted(query))}"
+
+    @staticmethod
+    def endpoint_of(key: str) -> str:
+        return "detail" if "recordID=" in key else "chain"
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at, endpoint FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            body, fetched_at, endpoint = row
+            now = time.time()
+            if not self.offline and now - fetched_at > self.ttls.get(endpoint, 0.0):
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(body))
+
+    def put(self, key: str, js: dict):
+        body = zlib.compress(json.dumps(js, separators=(",", ":")).encode())
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.endpoint_of(key), body, len(body), now, now))
+            self._bytes += len(body) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # drop least recently used entries until 90% of the budget is free for new writes
+        target = int(self.max_bytes * 0.9)
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bytes -= size
+
+class MemoryCache:
+    """
+    In-process counterpart of ResponseCache for serve mode: same keys and TTLs,
+    parsed responses kept in memory and evicted least recently used first once
+    their JSON size exceeds max_bytes. Shared by every request the server handles.
+    """
+    offline = False
+    make_key = staticmethod(ResponseCache.make_key)
+    endpoint_of = staticmethod(ResponseCache.endpoint_of)
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.ttls = {**CACHE_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, int, dict]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            fetched_at, _, js = entry
+            if time.time() - fetched_at > self.ttls.get(self.endpoint_of(key), 0.0):
+                return None
+            self._entries.move_to_end(key)
+            return js
+
+    def put(self, key: str, js: dict):
+        size = len(json.dumps(js, separators=(",", ":")))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            self._bytes += size - (old[1] if old else 0)
+            self._entries[key] = (time.time(), size, js)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, dropped, _) = self._entries.popitem(last=False)
+                self._bytes -= dropped
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"entries": len(self._entries), "mb": round(self._bytes / 1024 / 1024, 3)}
+
+RESPONSE_CACHE = None   # ResponseCache, MemoryCache (serve mode) or None
+
+# ---------------------------
+# Asset class resolution
+# ---------------------------
+ASSET_CLASSES = ("stocks", "etf")
+
+class AssetClassResolver:
+    """
+    Thread-safe ticker -> NASDAQ assetclass ('stocks' / 'etf') map.
+    Seeded from a JSON file when `path` is given, and written back whenever a
+    ticker's class is discovered, so each ETF costs its extra request only once.
+    """
+    def __init__(self, path: str = ""):
+        self.path = path
+        self._lock = threading.Lock()
+        self._classes: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._classes = {k.upper(): v for k, v in json.load(f).items() if v in ASSET_CLASSES}
+
+    def get(self, ticker: str) -> Optional[str]:
+        with self._lock:
+            return self._classes.get(ticker.upper())
+
+    def candidates(self, ticker: str) -> List[str]:
+        """Classes to try in order: the known one first, then the rest."""
+        known = self.get(ticker)
+        return [known] + [c for c in ASSET_CLASSES if c != known] if known else list(ASSET_CLASSES)
+
+    def remember(self, ticker: str, assetclass: str):
+        with self._lock:
+            if self._classes.get(ticker.upper()) == assetclass:
+                return
+            self._classes[ticker.upper()] = assetclass
+            if self.path:
+                tmp = f"{self.path}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(self._classes, f, indent=1, sort_keys=True)
+                os.replace(tmp, self.path)
+
+ASSETCLASS_RESOLVER = AssetClassResolver()
+
+def parse_cache_ttl(text: str) -> Dict[str, float]:
+    """'600' sets every endpoint; 'chain=300,detail=86400' sets them individually."""
+    text = (text or "").strip()
+    if not text:
+        return {}
+    if "=" not in text:
+        return {k: float(text) for k in CACHE_TTLS}
+    out = {}
+    for part in text.split(","):
+        k, _, v = part.partition("=")
+        if k.strip() not in CACHE_TTLS:
+            raise ValueError(f"unknown cache endpoint '{k.strip()}' (expected one of {', '.join(CACHE_TTLS)})")
+        out[k.strip()] = float(v)
+    return out
+
 # ---------------------------
 # Helpers
 # ---------------------------
-def parse_money(value: str) -> Optional[float]:
-    if value is None: return None
-    s = str(value).strip().replace("$","").replace(",","")
-    if s in ("--","-",""): return None
-    try: return float(s)
-    except: return None
+def _session() -> requests.Session:
+    # one keep-alive session per worker thread
+    sess = getattr(_local, "session", None)
+    if sess is None:
+        sess = _local.session = requests.Session()
+        sess.headers.update(HEADERS)
+    return sess
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Jittered exponential backoff; honours a numeric Retry-After header."""
+    try:
+        if retry_after is not None:
+            return min(BACKOFF_CAP, float(retry_after)) + random.uniform(0, BACKOFF_BASE)
+    except ValueError:
+        pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key: the first caller runs fn, the others wait for its result."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+        if not leader:
+            METRICS.count("coalesced")
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+IN_FLIGHT_CALLS = SingleFlight()
 
 def fetch_json(url: str, params: dict=None) -> dict:
-    r = requests.get(url, headers=HEADERS, params=params, timeout=25)
-    r.raise_for_status()
-    return r.json()
+    cache = RESPONSE_CACHE
+    key = ResponseCache.make_key(url, params)
+    if cache is None:
+        return IN_FLIGHT_CALLS.do(key, lambda: _fetch_json_remote(url, params))
+    js = cache.get(key)
+    if js is not None:
+        METRICS.count("cache_hits")
+        return js
+    METRICS.count("cache_misses")
+    if cache.offline:
+        raise CacheMiss(f"offline: no cached response for {key}")
 
-def fetch_chain(ticker: str, fromdate: str, todate: str,
-                callput: str="call", money: str="all", limit: int=500) -> Tuple[pd.DataFrame, Optional[float]]:
-    global assetclass
+    def fetch_and_store():
+        js = _fetch_json_remote(url, params)
+        cache.put(key, js)
+        return js
+    # the same chain page or contract asked for by several tickers/requests at once goes upstream once
+    return IN_FLIGHT_CALLS.do(key, fetch_and_store)
+
+def _fetch_json_remote(url: str, params: dict=None) -> dict:
+    endpoint = "detail" if params and "recordID" in params else "chain"
+    for attempt in range(MAX_RETRIES + 1):
+        RATE_LIMITER.acquire()
+        METRICS.count("requests")
+        METRICS.count(f"requests.{endpoint}")
+        try:
+            with _INFLIGHT:
+                t0 = time.perf_counter()
+                try:
+                    r = _session().get(url, params=params, timeout=25)
+                except Exception:
+                    METRICS.observe_http(endpoint, time.perf_counter() - t0, None)
+                    raise
+                METRICS.observe_http(endpoint, time.perf_counter() - t0, r.status_code)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                METRICS.count("failures")
+                raise
+            METRICS.count("retries")
+            time.sleep(backoff_delay(attempt))
+            continue
+        if r.status_code in RETRY_STATUS and attempt < MAX_RETRIES:
+            METRICS.count("retries")
+            time.sleep(backoff_delay(attempt, r.headers.get("Retry-After")))
+            continue
+        if not r.ok:
+            METRICS.count("failures")
+        r.raise_for_status()
+        # per-thread count of responses that really came from NASDAQ (not a cache or a coalesced call)
+        _local.fetched = getattr(_local, "fetched", 0) + 1
+        return r.json()
+
+def _parse_spot(last_trade_raw: str) -> float:
+    m = re.search(r"\$([0-9]+\.[0-9]+)", last_trade_raw or "")
+    if m:
+        return float(m.group(1))
+    m = re.search(r"\$([0-9]+)", last_trade_raw or "")
+    if m:
+        return float(m.group(1))
+    return 0
+
+def fetch_chain_rows(ticker: str, fromdate: str, todate: str,
+                     callput: str="call", money: str="all", limit: int=500,
+                     assetclass: Optional[str] = None) -> Tuple[List[dict], float, Optional[str]]:
+    """
+    Raw table rows for one chain window, paging with `offset` until totalRecord
+    contracts have been read (a single request silently stops at `limit`).
+    Returns (rows, spot, assetclass). Without an explicit `assetclass` the
+    ticker's class comes from ASSETCLASS_RESOLVER; unknown tickers are tried as
+    stocks, then as ETFs (NASDAQ answers data: null for the wrong class).
+    """
     url = f"{NASDAQ_BASE}/api/quote/{ticker}/option-chain"
     params = {
-        "assetclass": assetclass,
         "limit": str(limit),
         "fromdate": fromdate,
         "todate": todate,
@@ -83,51 +568,166 @@ def fetch_chain(ticker: str, fromdate: str, todate: str,
         "money": money,        # in/out/all
         "type": "all",
     }
-    js = fetch_json(url, params=params)
-    if js.get("data", {}) is None:
-        assetclass = "etf"
-        params["assetclass"] = assetclass
-        js = fetch_json(url, params=params)
-    time.sleep(0.5)
-    rows = []
-    spot = 0
-    if js.get("data", {}).get("totalRecord") > 0:
-        rows = (js or {}).get("data", {}).get("table", {}).get("rows", []) or []
-        last_trade_raw = (js or {}).get("data", {}).get("lastTrade", "")
-        m = re.search(r"\$([0-9]+\.[0-9]+)", last_trade_raw or "")
-        if m:
-            spot = float(m.group(1))
-        else:
-            m = re.search(r"\$([0-9]+)", last_trade_raw or "")
-            if m:
-                spot = float(m.group(1))
+    js, resolved = {}, None
+    for cls in ([assetclass] if assetclass else ASSETCLASS_RESOLVER.candidates(ticker)):
+        js = fetch_json(url, params={"assetclass": cls, **params})
+        if js.get("data") is not None:
+            ASSETCLASS_RESOLVER.remember(ticker, cls)
+            resolved = cls
+            break
+    data = (js or {}).get("data") or {}
+    total = data.get("totalRecord") or 0
+    if total <= 0:
+        return [], 0, resolved
+    spot = _parse_spot(data.get("lastTrade", ""))
+    rows = list((data.get("table") or {}).get("rows") or [])
+    seen = sum(1 for r in rows if not r.get("expirygroup"))
+    while 0 < seen < total:
+        page = ((fetch_json(url, params={"assetclass": resolved, **params, "offset": str(seen)})
+                 .get("data") or {}).get("table") or {}).get("rows") or []
+        got = sum(1 for r in page if not r.get("expirygroup"))
+        if got == 0:
+            break
+        rows.extend(page)
+        seen += got
+    return rows, spot, resolved
+
+# raw chain row field -> column, parsed as money (float32) or counts (int32)
+CHAIN_MONEY_FIELDS = {"strike": "strike", "c_Bid": "bid", "c_Ask": "ask", "c_Last": "last"}
+CHAIN_COUNT_FIELDS = {"c_Volume": "volume", "c_Openinterest": "openInterest"}
 
-    recs = []
-    expiry = ""
+def parse_numbers(values: List) -> np.ndarray:
+    """
+    Money/count strings ('1,234.50', '$12', '--', None) -> float64, NaN where
+    not a number. The values are cleaned as one joined string and converted in
+    a single NumPy call; anything else unusual falls back to pd.to_numeric.
+    """
+    text = "\n".join(map(str, values)).replace(",", "").replace("$", "")
+    parts = text.replace("--", "nan").replace("None", "nan").split("\n")
+    if len(parts) == len(values):
+        try:
+            return np.array(parts, dtype=np.float64)
+        except ValueError:
+            pass
+    text = pd.Series(values, dtype="string").str.replace(r"[$,\s]", "", regex=True)
+    return pd.to_numeric(text, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+def parse_chain_rows(rows: List[dict]) -> pd.DataFrame:
+    """
+    Parse raw option-chain table rows into a compact frame: expirygroup header
+    rows label the contracts after them, money fields become float32,
+    volume/OI int32 and expiryDate a categorical. Each numeric field is
+    converted by one parse_numbers call, so only one field's text is alive at once.
+    """
+    contracts, groups, sizes = [], [], []
     for r in rows:
-        if r.get("expirygroup") is not None and r.get("expirygroup") != "":
-            expiry = r.get("expirygroup")
-        else:
-            recs.append({
-                "expiryDate": expiry,
-                "strike": parse_money(r.get("strike")),
-                "bid": parse_money(r.get("c_Bid")),
-                "ask": parse_money(r.get("c_Ask")),
-                "last": parse_money(r.get("c_Last")),
-                "volume": 0 if (r.get("c_Volume") in (None,"--")) else int(str(r.get("c_Volume")).replace(",","")),
-                "openInterest": 0 if (r.get("c_Openinterest") in (None,"--")) else int(str(r.get("c_Openinterest")).replace(",","")),
-                "detail_path": r.get("drillDownURL"),
-            })
-    df = pd.DataFrame(recs)
-    if not df.empty:
-        df["mid"] = (df["bid"].fillna(0) + df["ask"].fillna(0)) / 2
-    return df, spot
-
-def fetch_greeks(ticker, detail_path: str) -> Dict[str, Optional[float]]:
-    global assetclass
-    url = f"{NASDAQ_BASE}{detail_path}".replace(f"https://api.nasdaq.com/market-activity/{assetclass}/{ticker.lower()}/option-chain/call-put-options/", f"https://api.nasdaq.com/api/quote/{ticker.lower()}/option-chain?assetclass={assetclass}&recordID=")
-    js = fetch_json(url)
-    time.sleep(1)
+        if r.get("expirygroup"):
+            groups.append(r["expirygroup"])
+            sizes.append(0)
+            continue
+        if not groups:
+            groups.append("")
+            sizes.append(0)
+        contracts.append(r)
+        sizes[-1] += 1
+    if not contracts:
+        return pd.DataFrame()
+
+    labels = pd.Index(sorted(set(groups)))
+    cols = {"expiryDate": pd.Categorical.from_codes(np.repeat(labels.get_indexer(groups), sizes), labels)}
+    for name, col in CHAIN_MONEY_FIELDS.items():
+        cols[col] = parse_numbers([r.get(name) for r in contracts]).astype(np.float32)
+    for name, col in CHAIN_COUNT_FIELDS.items():
+        cols[col] = np.nan_to_num(parse_numbers([r.get(name) for r in contracts])).astype(np.int32)
+    cols["detail_path"] = pd.Series([r.get("drillDownURL") for r in contracts])
+    cols["mid"] = (np.nan_to_num(cols["bid"]) + np.nan_to_num(cols["ask"])) / 2
+    return pd.DataFrame(cols)
+
+def fetch_chain(ticker: str, fromdate: str, todate: str,
+                callput: str="call", money: str="all", limit: int=500,
+                assetclass: Optional[str] = None) -> Tuple[pd.DataFrame, Optional[float]]:
+    with METRICS.stage("fetch_chain"):
+        rows, spot, _ = fetch_chain_rows(ticker, fromdate, todate, callput, money, limit, assetclass)
+        return parse_chain_rows(rows), spot
+
+def chain_windows(leaps_from: str, leaps_to: str, shorts_from: str, shorts_to: str) -> List[Tuple[str, str, str]]:
+    """
+    (fromdate, todate, money) ranges a ChainSnapshot fetches: the in-the-money
+    LEAPS window and the out-of-the-money short window, or one money="all"
+    range when both windows cover the same dates. Fetching the span between
+    the windows instead would pull every expiry in between (weeklies included)
+    and costs more pages than the two windows together.
+    """
+    if (leaps_from, leaps_to) == (shorts_from, shorts_to):
+        return [(leaps_from, leaps_to, "all")]
+    return [(leaps_from, leaps_to, "in"), (shorts_from, shorts_to, "out")]
+
+class ChainSnapshot:
+    """
+    A ticker's call chain over the screening windows (see chain_windows),
+    parsed once into one frame sorted by expiry and strike. LEAPS and short
+    windows are sliced from it in memory (date range + moneyness against the
+    snapshot's single spot), so --watch can diff a whole chain between ticks.
+    """
+    def __init__(self, ticker: str, chain: pd.DataFrame, spot: float,
+                 assetclass: Optional[str] = None, fetched_at: Optional[datetime] = None):
+        self.ticker = ticker
+        self.spot = spot
+        self.assetclass = assetclass
+        self.fetched_at = fetched_at or datetime.utcnow()
+        if chain.empty:
+            self.chain, self._expiry = chain, pd.Series(dtype="datetime64[ns]")
+            return
+        expiry = expiry_datetimes(chain["expiryDate"], self.fetched_at)
+        order = np.lexsort((chain["strike"].to_numpy(), expiry.to_numpy()))
+        self.chain = add_dte(chain, self.fetched_at).iloc[order].reset_index(drop=True)
+        self._expiry = expiry.iloc[order].reset_index(drop=True)
+
+    @classmethod
+    def fetch(cls, ticker: str, windows: List[Tuple[str, str, str]], limit: int = 500,
+              assetclass: Optional[str] = None) -> "ChainSnapshot":
+        """One paged request per (fromdate, todate, money) window, with the server filtering moneyness."""
+        with METRICS.stage("fetch_chain"):
+            frames, spot = [], 0
+            for fromdate, todate, money in windows:
+                rows, window_spot, assetclass = fetch_chain_rows(ticker, fromdate, todate, callput="call",
+                                                                 money=money, limit=limit, assetclass=assetclass)
+                frames.append(parse_chain_rows(rows))
+                spot = spot or window_spot
+            frames = [f for f in frames if not f.empty]
+            if len(frames) > 1:
+                # label sets differ per window; union them so expiryDate stays categorical
+                labels = pd.api.types.union_categoricals([f["expiryDate"] for f in frames]).categories
+                for f in frames:
+                    f["expiryDate"] = f["expiryDate"].cat.set_categories(labels)
+                chain = pd.concat(frames, ignore_index=True).drop_duplicates("detail_path", ignore_index=True)
+            else:
+                chain = frames[0] if frames else pd.DataFrame()
+            return cls(ticker, chain, spot, assetclass)
+
+    def window(self, fromdate: str, todate: str, money: str = "all") -> pd.DataFrame:
+        """Contracts expiring in [fromdate, todate]; money in/out/all as in fetch_chain."""
+        if self.chain.empty:
+            return self.chain
+        mask = self._expiry.between(pd.Timestamp(fromdate), pd.Timestamp(todate)).to_numpy()
+        if money == "in":
+            mask = mask & (self.chain["strike"] <= self.spot).to_numpy()
+        elif money == "out":
+            mask = mask & (self.chain["strike"] > self.spot).to_numpy()
+        out = self.chain[mask].reset_index(drop=True)
+        if isinstance(out["expiryDate"].dtype, pd.CategoricalDtype):
+            out["expiryDate"] = out["expiryDate"].cat.remove_unused_categories()
+        return out
+
+def fetch_greeks(ticker, detail_path: str, assetclass: Optional[str] = None) -> Dict[str, Optional[float]]:
+    # detail_path is /market-activity/<class>/<ticker>/option-chain/call-put-options/<recordID>
+    assetclass = assetclass or ASSETCLASS_RESOLVER.get(ticker) or "stocks"
+    record_id = detail_path.rstrip("/").rsplit("/", 1)[-1]
+    url = f"{NASDAQ_BASE}/api/quote/{ticker.lower()}/option-chain"
+    before = getattr(_local, "fetched", 0)
+    js = fetch_json(url, params={"assetclass": assetclass, "recordID": record_id})
+    if getattr(_local, "fetched", 0) > before:
+        METRICS.ticker(ticker, greeks_fetched=1)
     data = (js or {}).get("data", {})
     greeks = (data.get("optionChainCallData") or {}).get("optionChainGreeksList") or {}
     # print('greeks', greeks)
@@ -144,64 +744,201 @@ def fetch_greeks(ticker, detail_path: str) -> Dict[str, Optional[float]]:
         "iv":    f("Impvol"),
     }
 
-def add_greeks(ticker, df: pd.DataFrame) -> pd.DataFrame:
+def _fetch_greeks_safe(ticker, path, assetclass: Optional[str] = None,
+                       known: Optional[Dict[str, Dict]] = None) -> Dict[str, Optional[float]]:
+    # `known` is a detail_path -> Greeks memo: read for hits, filled with new results
+    if not path or pd.isna(path): return {}
+    if known is not None and path in known:
+        METRICS.count("greeks_known")
+        return known[path]
+    try:
+        greeks = fetch_greeks(ticker, path, assetclass)
+    except Exception as e:
+        # keep NaNs on failures
+        log.warning("%s: %s", ticker, e)
+        return {}
+    if known is not None:
+        known[path] = greeks
+    return greeks
+
+def _fetch_greeks_many(ticker, paths: List, workers: int, assetclass: Optional[str] = None,
+                       known: Optional[Dict[str, Dict]] = None) -> List[Dict[str, Optional[float]]]:
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(lambda p: _fetch_greeks_safe(ticker, p, assetclass, known), paths))
+
+def _attach_greeks(out: pd.DataFrame, results: List[Dict[str, Optional[float]]]) -> pd.DataFrame:
+    greeks = pd.DataFrame.from_records(results, index=out.index, columns=list(GREEK_COLS))
+    for col in GREEK_COLS:
+        out[col] = pd.to_numeric(greeks[col], errors="coerce")
+    return out
+
+def add_greeks(ticker, df: pd.DataFrame, workers: int = 4, assetclass: Optional[str] = None,
+               known: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+    """
+    Fetch Greeks for every row with a detail_path, keeping up to `workers`
+    requests in flight (paced by RATE_LIMITER), and attach them as float columns.
+    Paths already in `known` are not fetched again.
+    """
     if df.empty: return df
     out = df.copy()
-    for col in ("delta","gamma","theta","vega","iv"):
-        out[col] = None
-    for idx, row in out.iterrows():
-        path = row.get("detail_path")
-        if not path: continue
-        try:
-            g = fetch_greeks(ticker, path)
-            for k, v in g.items():
-                out.at[idx, k] = v
-        except Exception as e:
-            # keep Nones on failures
-            print(e)
-            pass
+    with METRICS.stage("add_greeks"):
+        out = _attach_greeks(out, _fetch_greeks_many(ticker, out["detail_path"].tolist(), workers, assetclass, known))
     return out
 
-def within_days(expiry_text: str, now: datetime, min_days: int, max_days: Optional[int] = None) -> bool:
-    """Return True if expiry is between min_days and max_days from now."""
-    if not expiry_text or str(expiry_text).strip().lower() in ("none", "--", ""):
-        return False
-
-    expiry_text = str(expiry_text).strip()
-    dt = None
-
-    # Try known formats
-    date_formats = [
-        # "%b %d, %Y",  # Oct 17, 2025
-        # "%b %d %Y",  # Oct 17 2025
-        "%B %d, %Y"  # October 17, 2025
-        # "%B %d %Y",  # October 17 2025
-        # "%Y-%m-%d",  # 2025-10-17
-        # "%b %d",  # Oct 17
-        # "%B %d"  # October 17
-    ]
-    for fmt in date_formats:
+def add_greeks_in_band(ticker, df: pd.DataFrame, delta_low: float, delta_high: float,
+                       workers: int = 4, assetclass: Optional[str] = None,
+                       known: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+    """
+    Like add_greeks, but only for contracts whose delta lies in [delta_low, delta_high].
+
+    Call delta falls as strike rises within one expiry, so each expiry's strike
+    ladder is bisected with a few detail probes to find the first strike with
+    delta <= delta_high and the last with delta >= delta_low; only that slice is
+    enriched. Rows outside the band keep NaN Greeks, which the delta filters drop
+    just as they would drop the real values. An expiry whose probe comes back
+    without a delta is enriched in full. Rows without a strike have no place on
+    a ladder (and could never pair into a combo) so they are dropped.
+    """
+    if df.empty: return df
+    out = df[df["strike"].notna()].copy()
+    if len(out) < len(df):
+        log.debug("%s: dropped %d contracts without a strike", ticker, len(df) - len(out))
+    ladders = [g.sort_values("strike").index for _, g in out.groupby("expiryDate", sort=False, observed=True)]
+    paths = out["detail_path"]
+    results: Dict = {}
+
+    def search(ladder) -> List:
+        """Probe one ladder; returns the labels in the band that still need fetching."""
+        probed = {}
+        def delta_at(pos: int) -> Optional[float]:
+            label = ladder[pos]
+            if label not in probed:
+                probed[label] = _fetch_greeks_safe(ticker, paths[label], assetclass, known)
+            d = probed[label].get("delta")
+            return None if d is None or math.isnan(d) else d
+
+        def first(pred, lo: int) -> Optional[int]:
+            # first position >= lo where pred(delta) holds (pred is monotone along the ladder)
+            hi = len(ladder)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                d = delta_at(mid)
+                if d is None: return None
+                if pred(d): hi = mid
+                else: lo = mid + 1
+            return lo
+
+        start = first(lambda d: d <= delta_high, 0)
+        end = first(lambda d: d < delta_low, start) if start is not None else None
+        results.update(probed)
+        if start is None or end is None:
+            return [l for l in ladder if l not in probed]
+        return [l for l in ladder[start:end] if l not in probed]
+
+    with METRICS.stage("add_greeks"):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            todo = [l for labels in pool.map(search, ladders) for l in labels]
+        results.update(zip(todo, _fetch_greeks_many(ticker, [paths[l] for l in todo], workers, assetclass, known)))
+    log.debug("%s: ladder search enriched %d of %d contracts", ticker, len(results), len(out))
+    return _attach_greeks(out, [results.get(l, {}) for l in out.index])
+
+# Known expiry label formats, tried in order
+EXPIRY_FORMATS = [
+    "%B %d, %Y",  # October 17, 2025
+    "%b %d, %Y",  # Oct 17, 2025
+    "%B %d %Y",   # October 17 2025
+    "%b %d %Y",   # Oct 17 2025
+    "%Y-%m-%d",   # 2025-10-17
+    "%b %d",      # Oct 17
+    "%B %d",      # October 17
+]
+YEARLESS_FORMATS = ("%b %d", "%B %d")
+
+@lru_cache(maxsize=4096)
+def _parse_expiry_on(expiry_text: str, today: date) -> Optional[datetime]:
+    for fmt in EXPIRY_FORMATS:
         try:
-            if fmt == "%b %d":
+            if fmt in YEARLESS_FORMATS:
                 # Append year
-                dt = datetime.strptime(f"{expiry_text} {now.year}", "%b %d %Y")
+                dt = datetime.strptime(f"{expiry_text} {today.year}", f"{fmt} %Y")
                 # If already passed, assume next year
-                if dt < now:
+                if dt.date() < today:
                     dt = dt.replace(year=dt.year + 1)
             else:
                 dt = datetime.strptime(expiry_text, fmt)
-                # print(dt)
-            break
+            return dt
         except ValueError:
             continue
+    return None
+
+def parse_expiry(expiry_text: str, now: datetime) -> Optional[datetime]:
+    """Parse a NASDAQ expiry label (e.g. 'October 17, 2025'); None if unrecognised. Memoized per label."""
+    if not expiry_text or str(expiry_text).strip().lower() in ("none", "--", "", "nan"):
+        return None
+    return _parse_expiry_on(str(expiry_text).strip(), now.date())
+
+def expiry_datetimes(expiry: pd.Series, now: datetime) -> pd.Series:
+    """Expiry labels -> datetime64, parsing each distinct label once (NaT if unparseable)."""
+    labels = expiry.astype("category")
+    parsed = pd.to_datetime(pd.Series([parse_expiry(str(c), now) for c in labels.cat.categories], dtype=object))
+    codes = labels.cat.codes.to_numpy()
+    values = np.where(codes >= 0, parsed.to_numpy()[np.maximum(codes, 0)] if len(parsed) else np.datetime64("NaT"),
+                      np.datetime64("NaT"))
+    return pd.Series(values, index=expiry.index, dtype="datetime64[ns]")
+
+def days_to_expiry(expiry: pd.Series, now: datetime) -> pd.Series:
+    """Whole days from now to each expiry, as a nullable Int32 (truncated, like timedelta.days)."""
+    return ((expiry_datetimes(expiry, now) - pd.Timestamp(now)) // pd.Timedelta(days=1)).astype("Int32")
 
-    if not dt:
-        return False
+def add_dte(df: pd.DataFrame, now: datetime) -> pd.DataFrame:
+    if df.empty or "dte" in df.columns: return df
+    out = df.copy()
+    out["dte"] = days_to_expiry(out["expiryDate"], now)
+    return out
+
+def dte_between(dte: pd.Series, min_days: int, max_days: Optional[int] = None) -> pd.Series:
+    """Boolean mask for min_days <= dte <= max_days; unparseable expiries never match."""
+    mask = dte >= min_days
+    if max_days is not None:
+        mask &= dte <= max_days
+    return mask.fillna(False).astype(bool)
+
+def years_to_expiry(expiry: pd.Series, now: datetime) -> np.ndarray:
+    """Year fractions from now to each expiry's close (NaN if unparseable)."""
+    days = (expiry_datetimes(expiry, now) - pd.Timestamp(now)) / pd.Timedelta(days=1)
+    return ((days + EXPIRY_CLOSE_DAY_FRACTION) / 365.0).to_numpy(dtype=np.float64)
+
+def add_local_greeks(df: pd.DataFrame, spot: float, now: datetime,
+                     rate: float = 0.04, div_yield: float = 0.0) -> pd.DataFrame:
+    """
+    Black-Scholes IV and Greeks for a whole chain from its mid prices (last
+    trade when there is no quote), computed in one batch with no HTTP calls.
+    """
+    if df.empty: return df
+    with METRICS.stage("local_greeks"):
+        return _local_greeks(df.copy(), spot, now, rate, div_yield)
+
+def _local_greeks(out: pd.DataFrame, spot: float, now: datetime, rate: float, div_yield: float) -> pd.DataFrame:
+    price = out["mid"].where(out["mid"] > 0, out["last"]).to_numpy(dtype=np.float64)
+    strike = out["strike"].to_numpy(dtype=np.float64)
+    T = np.maximum(years_to_expiry(out["expiryDate"], now), 0.0)
+    iv = implied_vol(price, spot, strike, T, rate, div_yield)
+    greeks = call_greeks(spot, strike, T, rate, div_yield, iv)
+    for col in ("delta", "gamma", "theta", "vega"):
+        out[col] = greeks[col]
+    out["iv"] = iv
+    return out
+
+def greeks_accuracy(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Mean/max absolute error of the '<greek>_local' columns against remote values."""
+    stats = {}
+    for col in GREEK_COLS:
+        if f"{col}_local" not in df.columns: continue
+        err = (df[f"{col}_local"] - df[col]).abs().dropna()
+        if err.empty: continue
+        stats[col] = {"n": int(len(err)), "mae": float(err.mean()), "max": float(err.max())}
+    return stats
 
-    days = (dt - now).days
-    if max_days is None:
-        return days >= min_days
-    return min_days <= days <= max_days
 # ---------------------------
 # Config & scoring
 # ---------------------------
@@ -221,66 +958,160 @@ class PMCCSelectionConfig:
     short_delta_high: float = 0.40
     early_close_buffer: float = 0.30
 
+    # Ranking (see pmcc_scoring); shorts go by mid/iv/delta unless short_weights is set
+    leaps_weights: LeapsWeights = field(default_factory=LeapsWeights)
+    short_weights: Optional[ShortWeights] = None
 
-def score_leaps_row(row, cfg: PMCCSelectionConfig) -> float:
-    delta = float(row.get("delta") or 0.0)
-    iv = float(row.get("iv") or 1.0)
-    bid = float(row.get("bid") or 0.0)
-    ask = float(row.get("ask") or 0.0)
-    spr = (ask - bid) / ask if (ask and ask>0) else 1.0
-    vol = int(row.get("volume") or 0)
-    oi  = int(row.get("openInterest") or 0)
-    liq = min(1.0, (vol + oi) / 5000.0)
 
-    delta_score  = 1.0 - min(1.0, abs(delta - 0.80) / 0.20)   # closer to 0.8 better
-    iv_score     = 1.0 - min(1.0, iv / max(cfg.max_leaps_iv, 1e-6))  # lower better
-    spread_score = 1.0 - min(1.0, spr)                        # tighter better
-    liq_score    = liq
+@dataclass
+class EnrichmentConfig:
+    # concurrent detail requests per add_greeks call (global pacing is RATE_LIMITER)
+    workers: int = 4
+    # remote: detail endpoint per contract; local: Black-Scholes from chain quotes;
+    # hybrid: local for screening, remote only for the shortlisted contracts
+    mode: str = "remote"
+    rate: float = 0.04
+    div_yield: float = 0.0
+    hybrid_pool: float = 2.0   # shortlist this many x top_n before fetching remote Greeks
+    # remote mode: full = every contract; ladder = bisect each expiry for the delta band
+    search: str = "ladder"
+
+SETTABLE_TYPES = (bool, int, float, str)
+
+def settable_type(cls, name: str) -> type:
+    """
+    The annotated type of config field `name` (Optional[X] counts as X), for
+    fields that can be set from text (backtest --set/--sweep, serve parameters).
+    ValueError for unknown fields and for ones that are not a plain
+    bool/int/float/str, such as the weight dataclasses.
+    """
+    if name not in {f.name for f in fields(cls)}:
+        raise ValueError(f"unknown parameter {name!r}")
+    hint = get_type_hints(cls)[name]
+    args = [a for a in get_args(hint) if a is not type(None)]
+    if get_origin(hint) is Union and len(args) == 1:
+        hint = args[0]
+    if hint not in SETTABLE_TYPES:
+        raise ValueError(f"{name} ({getattr(hint, '__name__', hint)}) cannot be set this way; "
+                         f"only {'/'.join(t.__name__ for t in SETTABLE_TYPES)} fields can")
+    return hint
+
+def cast_field(cls, name: str, value):
+    """value (text, or a Python value) as config field `name`'s annotated type; ValueError if it is not one."""
+    typ = settable_type(cls, name)
+    if isinstance(value, str):
+        text = value.strip()
+        if typ is bool:
+            if text.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(f"{name} expects true/false, got {value!r}")
+            return text.lower() in ("true", "1")
+        try:
+            return typ(text)
+        except ValueError:
+            raise ValueError(f"{name} expects {typ.__name__}, got {value!r}") from None
+    if typ is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if type(value) is not typ:
+        raise ValueError(f"{name} expects {typ.__name__}, got {value!r}")
+    return value
 
-    # weights
-    return 0.5*delta_score + 0.2*iv_score + 0.2*spread_score + 0.1*liq_score
 
 # ---------------------------
 # Per-ticker candidate selection
 # ---------------------------
+def filter_rank_leaps(leaps_df: pd.DataFrame, cfg: PMCCSelectionConfig, top_n: int) -> pd.DataFrame:
+    if leaps_df.empty: return leaps_df
+    with METRICS.stage("filter_score"):
+        leaps_df = leaps_df[
+            leaps_df["delta"].astype(float).between(cfg.target_leaps_delta_low, cfg.target_leaps_delta_high, inclusive="both")
+            & (leaps_df["iv"].astype(float) <= cfg.max_leaps_iv)
+        ].copy()
+        if not leaps_df.empty:
+            leaps_df = top_leaps(leaps_df, cfg.max_leaps_iv, top_n, cfg.leaps_weights)
+        return leaps_df
+
+def filter_rank_shorts(shorts_df: pd.DataFrame, cfg: PMCCSelectionConfig, top_n: int, spot: float) -> pd.DataFrame:
+    if shorts_df.empty: return shorts_df
+    with METRICS.stage("filter_score"):
+        shorts_df = shorts_df[
+            shorts_df["delta"].astype(float).between(cfg.short_delta_low, cfg.short_delta_high, inclusive="both")
+        ].copy()
+        if not shorts_df.empty:
+            shorts_df = top_shorts(shorts_df, top_n, spot, cfg.short_weights)
+        return shorts_df
+
+def remote_greeks_for_shortlist(ticker: str, df: pd.DataFrame, workers: int,
+                                assetclass: Optional[str] = None,
+                                known: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+    """Keep local Greeks as '<greek>_local' and overwrite the Greeks with the detail endpoint's values."""
+    if df.empty: return df
+    out = df.rename(columns={c: f"{c}_local" for c in GREEK_COLS})
+    return add_greeks(ticker, out, workers=workers, assetclass=assetclass, known=known)
+
 def select_candidates_for_ticker(ticker: str,
                                  leaps_from: str, leaps_to: str,
                                  shorts_from: str, shorts_to: str,
                                  cfg: PMCCSelectionConfig,
                                  top_n_leaps: int,
-                                 top_n_shorts: int) -> Tuple[pd.DataFrame, pd.DataFrame, float]:
-    leaps_df, spot1  = fetch_chain(ticker, leaps_from,  leaps_to,  callput="call", money="in")
-    # print(leaps_df)
-    shorts_df, spot2 = fetch_chain(ticker, shorts_from, shorts_to, callput="call", money="out")
-    # print(shorts_df)
-    spot = spot1 or spot2
+                                 top_n_shorts: int,
+                                 enrich: Optional[EnrichmentConfig] = None,
+                                 snapshot: Optional[ChainSnapshot] = None,
+                                 known_greeks: Optional[Dict[str, Dict]] = None) -> Tuple[pd.DataFrame, pd.DataFrame, float]:
+    """
+    `snapshot` screens an already fetched chain (otherwise one is fetched) and
+    `known_greeks` is a detail_path -> Greeks memo shared with the remote
+    enrichment helpers, both used by --watch to skip unchanged contracts.
+    """
+    enrich = enrich or EnrichmentConfig()
+    t0 = time.perf_counter()
+    snap = snapshot or ChainSnapshot.fetch(ticker, chain_windows(leaps_from, leaps_to, shorts_from, shorts_to))
+    leaps_df  = snap.window(leaps_from, leaps_to, money="in")
+    shorts_df = snap.window(shorts_from, shorts_to, money="out")
+    spot, assetclass = snap.spot, snap.assetclass
     if spot is None:
         raise RuntimeError(f"{ticker}: Could not parse spot from NASDAQ response.")
 
     now = datetime.utcnow()
+    leaps_df, shorts_df = add_dte(leaps_df, now), add_dte(shorts_df, now)
     if not leaps_df.empty:
-        leaps_df = leaps_df[leaps_df["expiryDate"].apply(lambda x: within_days(str(x), now, cfg.min_days_to_expiry))]
+        leaps_df = leaps_df[dte_between(leaps_df["dte"], cfg.min_days_to_expiry)]
     if not shorts_df.empty:
-        shorts_df = shorts_df[shorts_df["expiryDate"].apply(lambda x: within_days(str(x), now, cfg.short_min_days, cfg.short_max_days))]
-
-    leaps_df  = add_greeks(ticker, leaps_df)
-    shorts_df = add_greeks(ticker, shorts_df)
+        shorts_df = shorts_df[dte_between(shorts_df["dte"], cfg.short_min_days, cfg.short_max_days)]
+    METRICS.ticker(ticker, contracts=len(leaps_df) + len(shorts_df))
 
-    if not leaps_df.empty:
-        leaps_df = leaps_df[
-            leaps_df["delta"].astype(float).between(cfg.target_leaps_delta_low, cfg.target_leaps_delta_high, inclusive="both")
-            & (leaps_df["iv"].astype(float) <= cfg.max_leaps_iv)
-        ].copy()
-        if not leaps_df.empty:
-            leaps_df["score"] = leaps_df.apply(lambda r: score_leaps_row(r, cfg), axis=1)
-            leaps_df = leaps_df.sort_values(["score"], ascending=False).head(top_n_leaps)
-
-    if not shorts_df.empty:
-        shorts_df = shorts_df[
-            shorts_df["delta"].astype(float).between(cfg.short_delta_low, cfg.short_delta_high, inclusive="both")
-        ].copy()
-        if not shorts_df.empty:
-            shorts_df = shorts_df.sort_values(by=["mid","iv","delta"], ascending=[False, False, True]).head(top_n_shorts)
+    if enrich.mode == "remote":
+        if enrich.search == "ladder":
+            leaps_df  = add_greeks_in_band(ticker, leaps_df, cfg.target_leaps_delta_low, cfg.target_leaps_delta_high,
+                                           workers=enrich.workers, assetclass=assetclass, known=known_greeks)
+            shorts_df = add_greeks_in_band(ticker, shorts_df, cfg.short_delta_low, cfg.short_delta_high,
+                                           workers=enrich.workers, assetclass=assetclass, known=known_greeks)
+        else:
+            leaps_df  = add_greeks(ticker, leaps_df, workers=enrich.workers, assetclass=assetclass, known=known_greeks)
+            shorts_df = add_greeks(ticker, shorts_df, workers=enrich.workers, assetclass=assetclass,
+                                   known=known_greeks)
+        archive_windows(ticker, leaps_df, shorts_df, spot, now)
+        leaps_df  = filter_rank_leaps(leaps_df, cfg, top_n_leaps)
+        shorts_df = filter_rank_shorts(shorts_df, cfg, top_n_shorts, spot)
+    else:
+        leaps_df  = add_local_greeks(leaps_df, spot, now, enrich.rate, enrich.div_yield)
+        shorts_df = add_local_greeks(shorts_df, spot, now, enrich.rate, enrich.div_yield)
+        archive_windows(ticker, leaps_df, shorts_df, spot, now)
+        if enrich.mode == "local":
+            leaps_df  = filter_rank_leaps(leaps_df, cfg, top_n_leaps)
+            shorts_df = filter_rank_shorts(shorts_df, cfg, top_n_shorts, spot)
+        else:
+            pool_l = max(top_n_leaps, int(math.ceil(top_n_leaps * enrich.hybrid_pool)))
+            pool_s = max(top_n_shorts, int(math.ceil(top_n_shorts * enrich.hybrid_pool)))
+            leaps_df  = remote_greeks_for_shortlist(ticker, filter_rank_leaps(leaps_df, cfg, pool_l), enrich.workers,
+                                                    assetclass, known_greeks)
+            shorts_df = remote_greeks_for_shortlist(ticker, filter_rank_shorts(shorts_df, cfg, pool_s, spot), enrich.workers,
+                                                    assetclass, known_greeks)
+            acc = greeks_accuracy(pd.concat([leaps_df, shorts_df]))
+            if acc:
+                log.info("%s: local vs remote Greeks: %s", ticker, ", ".join(
+                    f"{k} mae={v['mae']:.4f} max={v['max']:.4f} (n={v['n']})" for k, v in acc.items()))
+            leaps_df  = filter_rank_leaps(leaps_df, cfg, top_n_leaps)
+            shorts_df = filter_rank_shorts(shorts_df, cfg, top_n_shorts, spot)
     # tag ticker
     if not leaps_df.empty:
         leaps_df["ticker"]  = ticker
@@ -288,137 +1119,553 @@ def select_candidates_for_ticker(ticker: str,
     if not shorts_df.empty:
         shorts_df["ticker"] = ticker
         shorts_df["spot"] = spot
-    print(leaps_df)
-    print(shorts_df)
+    log.info("%s", leaps_df)
+    log.info("%s", shorts_df)
+    METRICS.ticker(ticker, kept_leaps=len(leaps_df), kept_shorts=len(shorts_df), seconds=time.perf_counter() - t0)
+    return leaps_df.reset_index(drop=True), shorts_df.reset_index(drop=True), spot
+
+# ---------------------------
+# Chain archive
+# ---------------------------
+CHAIN_ARCHIVE: Optional[ChainArchive] = None
+# columns filter_rank_* and build_combos read back from the archive
+ARCHIVE_SCREEN_COLUMNS = ["leg", "expiryDate", "expiry", "dte", "strike", "bid", "ask", "last", "mid",
+                          "volume", "openInterest", "detail_path", "spot"] + list(GREEK_COLS)
+
+def archive_windows(ticker: str, leaps_df: pd.DataFrame, shorts_df: pd.DataFrame, spot: float, at: datetime):
+    """Write a ticker's enriched LEAPS/short windows to CHAIN_ARCHIVE (when set)."""
+    if CHAIN_ARCHIVE is None:
+        return
+    frames = [df.assign(leg=leg) for leg, df in (("leaps", leaps_df), ("short", shorts_df)) if not df.empty]
+    if not frames:
+        return
+    df = pd.concat(frames, ignore_index=True)
+    df["expiry"] = expiry_datetimes(df["expiryDate"], at)
+    df["spot"] = spot
+    with METRICS.stage("archive"):
+        CHAIN_ARCHIVE.write(ticker, df, at)
+
+def select_candidates_from_archive(ticker: str,
+                                   leaps_from: str, leaps_to: str,
+                                   shorts_from: str, shorts_to: str,
+                                   cfg: PMCCSelectionConfig,
+                                   top_n_leaps: int,
+                                   top_n_shorts: int,
+                                   enrich: Optional[EnrichmentConfig] = None,
+                                   archive: Optional[ChainArchive] = None,
+                                   as_of: Optional[datetime] = None) -> Tuple[pd.DataFrame, pd.DataFrame, float]:
+    """
+    select_candidates_for_ticker over the newest archived snapshot taken at or
+    before `as_of`, with no network calls. Only the needed columns are read, and
+    the expiry windows and delta/IV filters are pushed down to the Parquet scan.
+    """
+    archive = archive or CHAIN_ARCHIVE
+    at = archive.latest(ticker, as_of)
+    if at is None:
+        raise RuntimeError(f"{ticker}: no archived snapshot" + (f" at or before {as_of}" if as_of else ""))
+    end = lambda d: pd.Timestamp(d) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    with METRICS.stage("archive_load"):
+        leaps_df = archive.load(ticker, at, ARCHIVE_SCREEN_COLUMNS, legs=["leaps"], ranges={
+            "expiry": (leaps_from, end(leaps_to)),
+            "delta": (cfg.target_leaps_delta_low, cfg.target_leaps_delta_high),
+            "iv": (None, cfg.max_leaps_iv)})
+        shorts_df = archive.load(ticker, at, ARCHIVE_SCREEN_COLUMNS, legs=["short"], ranges={
+            "expiry": (shorts_from, end(shorts_to)),
+            "delta": (cfg.short_delta_low, cfg.short_delta_high)})
+        spots = archive.load(ticker, at, ["spot"])["spot"].dropna()
+    if spots.empty:
+        raise RuntimeError(f"{ticker}: archived snapshot {at} is empty")
+    spot = round(float(spots.iloc[0]), F32_DECIMALS)
+    for df in (leaps_df, shorts_df):
+        # Greeks are archived as float32: undo only the widening noise (shortest float32 text), so NASDAQ's
+        # 4-decimal values come back exactly and --greeks local model values keep float32 precision
+        for col in GREEK_COLS:
+            df[col] = df[col].to_numpy(np.float32).astype(str).astype(np.float64)
+    leaps_df = leaps_df[dte_between(leaps_df["dte"], cfg.min_days_to_expiry)]
+    shorts_df = shorts_df[dte_between(shorts_df["dte"], cfg.short_min_days, cfg.short_max_days)]
+    leaps_df  = filter_rank_leaps(leaps_df.drop(columns=["leg", "expiry"]), cfg, top_n_leaps)
+    shorts_df = filter_rank_shorts(shorts_df.drop(columns=["leg", "expiry"]), cfg, top_n_shorts, spot)
+    for df in (leaps_df, shorts_df):
+        if not df.empty:
+            df["ticker"] = ticker
+            df["spot"] = spot
+    log.info("%s: screened archived snapshot %s UTC", ticker, f"{at:%Y-%m-%d %H:%M:%S}")
     return leaps_df.reset_index(drop=True), shorts_df.reset_index(drop=True), spot
 
 # ---------------------------
 # Build ALL combinations across tickers
 # ---------------------------
+COMBO_COLUMNS = [
+    "ticker", "spot",
+    # LEAPS leg
+    "leap_expiry", "leap_dte", "leap_strike", "leap_mid", "leap_delta", "leap_iv",
+    "leap_intrinsic_now", "leap_intrinsic_pct_of_price",
+    # Short leg
+    "short_expiry", "short_dte", "short_strike", "short_mid", "short_delta", "short_iv",
+    # Safety / structure
+    "cushion_to_short_strike_pct",
+    # P&L approximations
+    "net_debit_per_spread", "itm_close_pl_per_spread_$", "itm_close_roi_pct_on_net",
+    # Ranking metric
+    "metric2_premium_over_leap_price_pct",
+]
+
+# console column order
+COMBO_DISPLAY_COLUMNS = [
+    "ticker","spot",
+    "leap_expiry","leap_strike","leap_mid","leap_delta","leap_iv",
+    "short_expiry","short_strike","short_mid","short_delta","short_iv",
+    "metric2_premium_over_leap_price_pct",
+    "leap_intrinsic_now","leap_intrinsic_pct_of_price",
+    "cushion_to_short_strike_pct",
+    "net_debit_per_spread","itm_close_pl_per_spread_$","itm_close_roi_pct_on_net",
+]
+
+def display_columns(combos: pd.DataFrame) -> List[str]:
+    """COMBO_DISPLAY_COLUMNS plus the scenario summaries when they were computed."""
+    return COMBO_DISPLAY_COLUMNS + [c for c in SCENARIO_COLUMNS if c in combos.columns]
+
+F32_DECIMALS = 4   # chain prices are stored as float32; round away the noise when widening
+
+def _num(df: pd.DataFrame, col: str, keep_nan: bool = False) -> np.ndarray:
+    # float(row.get(col) or 0.0) for every row: a missing column is 0, and a NaN stays NaN
+    # (keep_nan, for the Greeks shown in the output) or becomes 0 so the mid/strike > 0 masks drop it
+    if col not in df.columns:
+        return np.zeros(len(df))
+    out = pd.to_numeric(df[col], errors="coerce")
+    out = (out if keep_nan else out.fillna(0.0)).to_numpy(dtype=np.float64)
+    return np.round(out, F32_DECIMALS) if df[col].dtype == np.float32 else out
+
+def _dte(df: pd.DataFrame) -> np.ndarray:
+    # the legs' persisted dte column (missing -> NaN), so combos never re-parse expiries
+    if "dte" not in df.columns:
+        return np.full(len(df), np.nan)
+    return df["dte"].astype("float64").to_numpy()
+
+def combos_for_ticker(leaps_df: pd.DataFrame, shorts_df: pd.DataFrame,
+                      early_close_buffer: float = 0.30,
+                      min_cushion_pct: float = 2.5) -> pd.DataFrame:
+    """
+    Cross-join one ticker's LEAPS with its shorts as array expressions.
+    Rows come out in the same (leap, short) order as a nested loop would produce.
+    """
+    ticker = leaps_df["ticker"].iloc[0]
+    spot = float(leaps_df["spot"].iloc[0]) if "spot" in leaps_df.columns else float("nan")
+
+    leap_mid, leap_strk = _num(leaps_df, "mid"), _num(leaps_df, "strike")
+    keep_l = (leap_mid > 0) & (leap_strk > 0)
+    short_mid, short_strk = _num(shorts_df, "mid"), _num(shorts_df, "strike")
+
+    # Cushion to short strike (%) only depends on the short, so mask before crossing
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cushion = ((short_strk - spot) / spot) * 100.0 if not math.isnan(spot) and spot > 0 \
+            else np.full(len(shorts_df), np.nan)
+    keep_s = (short_mid > 0) & (short_strk > 0) & (cushion > min_cushion_pct)
+
+    li, si = np.flatnonzero(keep_l), np.flatnonzero(keep_s)
+    if len(li) == 0 or len(si) == 0:
+        return pd.DataFrame(columns=COMBO_COLUMNS)
+    i = np.repeat(li, len(si))
+    j = np.tile(si, len(li))
+
+    lm, ls, sm, ss = leap_mid[i], leap_strk[i], short_mid[j], short_strk[j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Current LEAPS intrinsic and % of price
+        leap_intrinsic = np.maximum(spot - ls, 0.0)
+        intrinsic_pct = (leap_intrinsic / lm) * 100.0
+        # Your preferred ranking: metric2 (monthly premium as % of LEAPS price)
+        metric2 = (sm / lm) * 100.0
+        # Net debit (opening cash outlay per spread, per share)
+        net_debit = lm - sm
+        # ITM-close scenario P/L per spread in $ = [ (short_strk - leap_strk) - buffer + short_mid - leap_mid ] * 100
+        itm_close_pl = ((ss - ls) - early_close_buffer + sm - lm) * 100.0
+        # ROI on net debit for that scenario
+        roi = np.where(net_debit > 0, (itm_close_pl / (net_debit * 100.0)) * 100.0, np.nan)
+
+    return pd.DataFrame({
+        "ticker": np.full(len(i), ticker, dtype=object),
+        "spot": np.full(len(i), spot),
+        "leap_expiry": leaps_df["expiryDate"].to_numpy()[i],
+        "leap_dte": pd.array(_dte(leaps_df)[i], dtype="Int32"),
+        "leap_strike": ls,
+        "leap_mid": lm,
+        "leap_delta": _num(leaps_df, "delta", keep_nan=True)[i],
+        "leap_iv": _num(leaps_df, "iv", keep_nan=True)[i],
+        "leap_intrinsic_now": leap_intrinsic,
+        "leap_intrinsic_pct_of_price": intrinsic_pct,
+        "short_expiry": shorts_df["expiryDate"].to_numpy()[j],
+        "short_dte": pd.array(_dte(shorts_df)[j], dtype="Int32"),
+        "short_strike": ss,
+        "short_mid": sm,
+        "short_delta": _num(shorts_df, "delta", keep_nan=True)[j],
+        "short_iv": _num(shorts_df, "iv", keep_nan=True)[j],
+        "cushion_to_short_strike_pct": cushion[j],
+        "net_debit_per_spread": net_debit,
+        "itm_close_pl_per_spread_$": itm_close_pl,
+        "itm_close_roi_pct_on_net": roi,
+        "metric2_premium_over_leap_price_pct": metric2,
+    }, columns=COMBO_COLUMNS)
+
+def sort_columns(sort_key: str = "metric2") -> List[str]:
+    """Columns combos are ranked by (all descending) for a --sort choice."""
+    if sort_key == "metric2":
+        return ["metric2_premium_over_leap_price_pct", "short_mid"]
+    if sort_key == "risk":
+        # smallest loss (or biggest gain) after a -1 sigma move by the short's expiry
+        return ["scenario_pl_down_1sd_$", "metric2_premium_over_leap_price_pct"]
+    # Fallback secondary sort ideas if you pass other keys:
+    return ["itm_close_roi_pct_on_net", "metric2_premium_over_leap_price_pct"]
+
+def sort_combos(combos: pd.DataFrame, sort_key: str = "metric2") -> pd.DataFrame:
+    by = sort_columns(sort_key)
+    combos = combos.sort_values(by=by, ascending=[False] * len(by))
+    return combos.reset_index(drop=True)
+
 def build_combos(
     all_leaps: List[pd.DataFrame],
     all_shorts: List[pd.DataFrame],
     sort_key: str = "metric2",
     early_close_buffer: float = 0.30,  # $ per contract you assume to close ITM short near expiry
-    min_cushion_pct : float = 2.5
+    min_cushion_pct : float = 2.5,
+    scenarios: Optional[ScenarioConfig] = None
 ) -> pd.DataFrame:
     """
     Combine per-ticker LEAPS with same-ticker SHORTS only (PMCC).
     Adds practical metrics and sorts by metric2 by default (premium % of LEAPS price).
+    With `scenarios` (implied by sort_key="risk") the SCENARIO_COLUMNS are added too.
 
     Requires each per-ticker df to include a 'spot' column (same value for all rows).
     """
-    rows = []
+    if scenarios is None and sort_key == "risk":
+        scenarios = ScenarioConfig()
+    with METRICS.stage("build_combos"):
+        return _build_combos(all_leaps, all_shorts, sort_key, early_close_buffer, min_cushion_pct, scenarios)
+
+def _build_combos(all_leaps: List[pd.DataFrame], all_shorts: List[pd.DataFrame], sort_key: str,
+                  early_close_buffer: float, min_cushion_pct: float,
+                  scenarios: Optional[ScenarioConfig] = None) -> pd.DataFrame:
+    # first non-empty shorts df per ticker
+    shorts_by_ticker: Dict[str, pd.DataFrame] = {}
+    for s in all_shorts:
+        if not s.empty:
+            shorts_by_ticker.setdefault(s["ticker"].iloc[0], s)
+
+    frames = []
     for leaps_df in all_leaps:
         if leaps_df.empty:
             continue
-        ticker = leaps_df["ticker"].iloc[0]
-        # Find matching shorts df for the same ticker
-        match = [s for s in all_shorts if (not s.empty and s["ticker"].iloc[0] == ticker)]
-        if not match:
+        shorts_df = shorts_by_ticker.get(leaps_df["ticker"].iloc[0])
+        if shorts_df is None:
             continue
-        shorts_df = match[0]
+        part = combos_for_ticker(leaps_df, shorts_df, early_close_buffer, min_cushion_pct)
+        if not part.empty:
+            frames.append(part)
+
+    if not frames:
+        return pd.DataFrame()
+    combos = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    if scenarios is not None:
+        with METRICS.stage("scenarios"):
+            combos = add_scenario_columns(combos, scenarios, early_close_buffer)
+    return sort_combos(combos, sort_key)
 
-        spot = float(leaps_df.get("spot", [float("nan")])[0]) if "spot" in leaps_df.columns else float("nan")
+class GlobalRanking:
+    """
+    Global combo ranking merged one ticker at a time, capped at top_n rows (0 = keep all).
+    Ties are broken by the ticker's position in `order`, then by the ticker's own
+    row order, so the result does not depend on which ticker finished first.
+
+    With a cap, rows live in a min-heap of size top_n keyed by the sort columns,
+    so memory stays O(top_n) however many tickers are merged and each merge only
+    looks at the ticker's own top rows until one fails to beat the current worst.
+    Without one, tickers' frames are only collected, and sorted together the next
+    time top() is called.
+    """
+    def __init__(self, sort_key: str = "metric2", top_n: int = 0, order: Optional[List[str]] = None):
+        self.sort_key = sort_key
+        self.top_n = top_n
+        self._order = {t: i for i, t in enumerate(order or [])}
+        self._combos = pd.DataFrame()          # sorted merge of the frames added before the last top()
+        self._pending: List[pd.DataFrame] = []
+        self._heap: List[Tuple[tuple, tuple]] = []
+        self._columns: Optional[List[str]] = None
+        self._dtypes: Optional[pd.Series] = None
 
-        for _, L in leaps_df.iterrows():
-            leap_mid   = float(L.get("mid") or 0.0)
-            leap_strk  = float(L.get("strike") or 0.0)
-            leap_delta = float(L.get("delta") or 0.0)
-            leap_iv    = float(L.get("iv") or 0.0)
-            leap_exp   = L.get("expiryDate")
+    def add(self, combos: pd.DataFrame):
+        if combos.empty:
+            return
+        t = self._order.get(combos["ticker"].iloc[0], len(self._order))
+        if self.top_n > 0:
+            self._push(combos, t)
+            return
+        self._pending.append(combos.assign(_t=t, _r=np.arange(len(combos))))
 
-            if leap_mid <= 0 or leap_strk <= 0:
-                continue
+    def _merged(self) -> pd.DataFrame:
+        if self._pending:
+            frames = ([self._combos] if not self._combos.empty else []) + self._pending
+            merged = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            by = sort_columns(self.sort_key)
+            merged = merged.sort_values(by=by + ["_t", "_r"], ascending=[False] * len(by) + [True, True])
+            self._combos, self._pending = merged.reset_index(drop=True), []
+        return self._combos
 
-            # Current LEAPS intrinsic and % of price
-            leap_intrinsic = max((spot - leap_strk), 0.0) if not math.isnan(spot) else float("nan")
-            intrinsic_pct_of_price = (leap_intrinsic / leap_mid) * 100.0 if leap_mid > 0 and not math.isnan(leap_intrinsic) else float("nan")
+    def _push(self, combos: pd.DataFrame, t: int):
+        if self._columns is None:
+            self._columns, self._dtypes = list(combos.columns), combos.dtypes
+        # heap key: sort columns (NaN ranks last, as in sort_values), then earlier ticker / row first
+        keys = [pd.to_numeric(combos[c], errors="coerce").to_numpy(dtype=np.float64)
+                for c in sort_columns(self.sort_key)]
+        keys = [np.where(np.isnan(k), -np.inf, k) for k in keys]
+        # this ticker's rows, best first, of which at most top_n can make it in
+        best = np.lexsort([np.arange(len(combos))] + [-k for k in reversed(keys)])[:self.top_n]
+        rows = combos.iloc[best].itertuples(index=False, name=None)
+        for pos, row in zip(best, rows):
+            key = tuple(float(k[pos]) for k in keys) + (-t, -int(pos))
+            if len(self._heap) < self.top_n:
+                heapq.heappush(self._heap, (key, row))
+            elif key > self._heap[0][0]:
+                heapq.heapreplace(self._heap, (key, row))
+            else:
+                break   # the rest of this ticker's rows rank lower still
+
+    def __len__(self):
+        return len(self._heap) if self.top_n > 0 else len(self._combos) + sum(len(p) for p in self._pending)
+
+    def top(self, n: int = 0) -> pd.DataFrame:
+        if self.top_n > 0:
+            if not self._heap:
+                return pd.DataFrame()
+            rows = [row for _, row in sorted(self._heap, key=lambda e: e[0], reverse=True)]
+            out = pd.DataFrame.from_records(rows, columns=self._columns).astype(self._dtypes.to_dict())
+        else:
+            out = self._merged().drop(columns=["_t", "_r"], errors="ignore")
+        return out.head(n) if n > 0 else out
 
-            for _, S in shorts_df.iterrows():
-                short_mid   = float(S.get("mid") or 0.0)
-                short_strk  = float(S.get("strike") or 0.0)
-                short_delta = float(S.get("delta") or 0.0)
-                short_iv    = float(S.get("iv") or 0.0)
-                short_exp   = S.get("expiryDate")
+    def take(self) -> pd.DataFrame:
+        """The final top(), handed over rather than copied; the ranking is left empty."""
+        if self.top_n > 0:
+            out, self._heap = self.top(), []
+            return out
+        out, self._combos = self._merged(), pd.DataFrame()
+        out.drop(columns=["_t", "_r"], errors="ignore", inplace=True)
+        return out
 
-                if short_mid <= 0 or short_strk <= 0:
+# ---------------------------
+# Multi-ticker pipeline
+# ---------------------------
+UNIVERSE_TOP_N = 100   # --top-n default with --tickers-file
+
+def screen_tickers(tickers: List[str],
+                   leaps_from: str, leaps_to: str,
+                   shorts_from: str, shorts_to: str,
+                   cfg: PMCCSelectionConfig,
+                   top_n_leaps: int,
+                   top_n_shorts: int,
+                   enrich: Optional[EnrichmentConfig] = None,
+                   workers: int = 4,
+                   select=select_candidates_for_ticker):
+    """
+    Screen tickers concurrently and yield (ticker, leaps_df, shorts_df, spot, error)
+    as each one finishes; `select` is the per-ticker step (same signature as
+    select_candidates_for_ticker). The request budget is shared via RATE_LIMITER/_INFLIGHT,
+    so throughput scales with the budget rather than with the ticker count.
+    Only about 2 x workers tickers are queued at a time and a finished ticker's
+    frames are dropped once yielded, so a large universe is never held at once.
+    """
+    pending = iter(tickers)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        def submit(n: int):
+            for t in (next(pending, None) for _ in range(n)):
+                if t is None:
+                    return
+                futures[pool.submit(select, ticker=t,
+                                    leaps_from=leaps_from, leaps_to=leaps_to,
+                                    shorts_from=shorts_from, shorts_to=shorts_to,
+                                    cfg=cfg, top_n_leaps=top_n_leaps, top_n_shorts=top_n_shorts,
+                                    enrich=enrich)] = t
+
+        futures = {}
+        submit(2 * max(1, workers))
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in done:
+                t = futures.pop(fut)
+                try:
+                    leaps_df, shorts_df, spot = fut.result()
+                except Exception as e:
+                    yield t, None, None, None, e
                     continue
+                finally:
+                    submit(1)
+                yield t, leaps_df, shorts_df, spot, None
 
-                # Your preferred ranking: metric2 (monthly premium as % of LEAPS price)
-                metric2 = (short_mid / leap_mid) * 100.0 if leap_mid > 0 else float("nan")
-
-                # Net debit (opening cash outlay per spread)
-                net_debit = (leap_mid - short_mid)  # option prices are per share; *100 later if you want $ per contract
-
-                # Cushion to short strike (%)
-                cushion_pct = ((short_strk - spot) / spot) * 100.0 if not math.isnan(spot) and spot > 0 else float("nan")
-
-                # ITM-close scenario P/L (close both legs near short strike; short intrinsic ~0 at K_short, pay buffer)
-                # P/L per spread in $ = [ (short_strk - leap_strk) - buffer + short_mid - leap_mid ] * 100
-                itm_close_pl_per_spread = ((short_strk - leap_strk) - early_close_buffer + short_mid - leap_mid) * 100.0
-
-                # ROI on net debit for that scenario
-                roi_itm_close_pct = (itm_close_pl_per_spread / (net_debit * 100.0)) * 100.0 if net_debit > 0 else float("nan")
-                if cushion_pct > min_cushion_pct:
-                    rows.append({
-                        "ticker": ticker,
-                        "spot": spot,
-
-                        # LEAPS leg
-                        "leap_expiry": leap_exp,
-                        "leap_strike": leap_strk,
-                        "leap_mid": leap_mid,
-                        "leap_delta": leap_delta,
-                        "leap_iv": leap_iv,
-                        "leap_intrinsic_now": leap_intrinsic,
-                        "leap_intrinsic_pct_of_price": intrinsic_pct_of_price,
-
-                        # Short leg
-                        "short_expiry": short_exp,
-                        "short_strike": short_strk,
-                        "short_mid": short_mid,
-                        "short_delta": short_delta,
-                        "short_iv": short_iv,
-
-                        # Safety / structure
-                        "cushion_to_short_strike_pct": cushion_pct,  # distance from spot to short strike
-
-                        # P&L approximations
-                        "net_debit_per_spread": net_debit,           # in option points; $ *100 per contract
-                        "itm_close_pl_per_spread_$": itm_close_pl_per_spread,
-                        "itm_close_roi_pct_on_net": roi_itm_close_pct,
-
-                        # Ranking metric
-                        "metric2_premium_over_leap_price_pct": metric2,
-                    })
-
-    combos = pd.DataFrame(rows)
-    if combos.empty:
-        return combos
+# ---------------------------
+# Watch mode
+# ---------------------------
+QUOTE_COLS = ("bid", "ask", "mid", "openInterest")
+COMBO_KEY = ["ticker", "leap_expiry", "leap_strike", "short_expiry", "short_strike"]
+WATCH_MID_MOVE = 0.02   # re-enrich a contract when its mid moves by more than this fraction
 
-    # Sort
-    if sort_key == "metric2":
-        combos = combos.sort_values(
-            by=["metric2_premium_over_leap_price_pct", "short_mid"],
-            ascending=[False, False]
-        )
-    else:
-        # Fallback secondary sort ideas if you pass other keys:
-        combos = combos.sort_values(
-            by=["itm_close_roi_pct_on_net", "metric2_premium_over_leap_price_pct"],
-            ascending=[False, False]
-        )
-    combos = combos.reset_index(drop=True)
-    return combos
+def diff_chain(prev: Optional[pd.DataFrame], cur: pd.DataFrame,
+               mid_move: float = WATCH_MID_MOVE) -> Tuple[set, set, int]:
+    """
+    Compare two snapshots of one chain by detail_path.
+    Returns (new, moved, quote_changes): paths not in `prev`, paths whose mid
+    moved by more than `mid_move` of the previous mid (and at least a cent),
+    and how many common contracts changed bid/ask/mid/OI at all.
+    """
+    if cur.empty:
+        return set(), set(), 0
+    c = cur[cur["detail_path"].notna()].drop_duplicates("detail_path").set_index("detail_path")
+    if prev is None or prev.empty:
+        return set(c.index), set(), 0
+    p = prev[prev["detail_path"].notna()].drop_duplicates("detail_path").set_index("detail_path")
+    common = c.index.intersection(p.index)
+    pq = p.loc[common, list(QUOTE_COLS)].astype("float64").fillna(-1.0)
+    cq = c.loc[common, list(QUOTE_COLS)].astype("float64").fillna(-1.0)
+    pm, cm = pq["mid"].to_numpy(), cq["mid"].to_numpy()
+    moved = np.abs(cm - pm) > np.maximum(np.abs(pm) * mid_move, 0.01)
+    changed = (pq.to_numpy() != cq.to_numpy()).any(axis=1)
+    return set(c.index.difference(p.index)), set(common[moved]), int(changed.sum())
+
+def ranking_diff(old: Optional[pd.DataFrame], new: pd.DataFrame, sort_key: str = "metric2") -> pd.DataFrame:
+    """
+    Ranking changes between two ranked combo tables, one row per combo that
+    entered, dropped out, or changed rank/metric: COMBO_KEY, rank_old, rank_new,
+    metric_old, metric_new, change ('new', 'dropped', 'moved').
+    """
+    metric = sort_columns(sort_key)[0]
+    def ranked(df):
+        if df is None or df.empty:
+            return pd.DataFrame(columns=COMBO_KEY + ["rank", "metric"])
+        return df[COMBO_KEY].assign(rank=np.arange(1, len(df) + 1), metric=df[metric].to_numpy())
+    both = ranked(old).merge(ranked(new), on=COMBO_KEY, how="outer", suffixes=("_old", "_new"), indicator=True)
+    for col in ("rank_old", "rank_new"):
+        both[col] = both[col].astype("Int64")
+    both["change"] = both["_merge"].map({"left_only": "dropped", "right_only": "new", "both": "moved"}).astype(object)
+    same = (both["change"] == "moved") & (both["rank_old"] == both["rank_new"]) \
+        & np.isclose(both["metric_old"].astype(float), both["metric_new"].astype(float), equal_nan=True)
+    out = both[~same].drop(columns="_merge")
+    return out.sort_values(["rank_new", "rank_old"], na_position="last").reset_index(drop=True)
+
+class Watcher:
+    """
+    In-memory screening state for --watch. Each tick re-fetches only the chains,
+    diffs quotes against the previous snapshot, re-enriches only contracts that
+    are new or whose mid moved past `mid_move` (other Greeks are reused), and
+    rebuilds combos only for tickers whose candidates changed. The state is
+    pickled to `state_path` after every tick so a restart resumes warm.
+    """
+    def __init__(self, tickers: List[str], windows: Dict[str, str], cfg: PMCCSelectionConfig,
+                 enrich: EnrichmentConfig, top_n_leaps: int, top_n_shorts: int,
+                 sort_key: str = "metric2", top_n: int = 0, mid_move: float = WATCH_MID_MOVE,
+                 state_path: str = "", workers: int = 4, scenarios: Optional[ScenarioConfig] = None):
+        self.tickers = tickers
+        self.windows = windows
+        self.cfg, self.enrich = cfg, enrich
+        self.top_n_leaps, self.top_n_shorts = top_n_leaps, top_n_shorts
+        self.sort_key, self.top_n = sort_key, top_n
+        self.mid_move = mid_move
+        self.state_path = state_path
+        self.workers = workers
+        self.scenarios = scenarios
+        # ticker -> {"chain", "spot", "greeks", "leaps", "shorts", "combos"}
+        self.state: Dict[str, Dict] = {}
+        self.last_top: Optional[pd.DataFrame] = None
+        self.load()
+
+    def load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            saved = pd.read_pickle(self.state_path)
+        except Exception as e:
+            print(f"watch: ignoring unreadable state {self.state_path}: {e}")
+            return
+        if saved.get("windows") != self.windows:
+            print(f"watch: state in {self.state_path} is for other date windows; starting cold")
+            return
+        self.state, self.last_top = saved["tickers"], saved["top"]
+        print(f"watch: resumed {len(self.state)} tickers from {self.state_path}")
+
+    def save(self):
+        if not self.state_path:
+            return
+        tmp = f"{self.state_path}.tmp"
+        pd.to_pickle({"windows": self.windows, "tickers": self.state, "top": self.last_top}, tmp)
+        os.replace(tmp, self.state_path)
+
+    def _tick_ticker(self, ticker: str) -> Dict:
+        w = self.windows
+        prev = self.state.get(ticker, {})
+        snap = ChainSnapshot.fetch(ticker, chain_windows(**w))
+        new, moved, quotes = diff_chain(prev.get("chain"), snap.chain, self.mid_move)
+        live = set(snap.chain["detail_path"].dropna()) if not snap.chain.empty else set()
+        greeks = {p: g for p, g in prev.get("greeks", {}).items() if p in live and p not in new and p not in moved}
+        reused = len(greeks)
+        leaps_df, shorts_df, spot = select_candidates_for_ticker(
+            ticker, **w, cfg=self.cfg, top_n_leaps=self.top_n_leaps, top_n_shorts=self.top_n_shorts,
+            enrich=self.enrich, snapshot=snap, known_greeks=greeks)
+        changed = "combos" not in prev or not (leaps_df.equals(prev["leaps"]) and shorts_df.equals(prev["shorts"]))
+        combos = build_combos([leaps_df], [shorts_df], sort_key=self.sort_key,
+                              early_close_buffer=self.cfg.early_close_buffer,
+                              min_cushion_pct=self.cfg.min_cushion_pct,
+                              scenarios=self.scenarios) if changed else prev["combos"]
+        self.state[ticker] = {"chain": snap.chain, "spot": spot, "greeks": greeks,
+                              "leaps": leaps_df, "shorts": shorts_df, "combos": combos}
+        return {"new": len(new), "moved": len(moved), "quotes": quotes,
+                "greeks_fetched": len(greeks) - reused, "recomputed": changed}
+
+    def tick(self) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Dict]]:
+        """One pass over all tickers; returns (ranked combos, ranking diff, per-ticker stats)."""
+        stats: Dict[str, Dict] = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            futures = {pool.submit(self._tick_ticker, t): t for t in self.tickers}
+            for fut in as_completed(futures):
+                t = futures[fut]
+                try:
+                    stats[t] = fut.result()
+                except Exception as e:
+                    # keep the ticker's previous combos in the ranking
+                    stats[t] = {"error": str(e)}
+        ranking = GlobalRanking(sort_key=self.sort_key, top_n=self.top_n, order=self.tickers)
+        for t in self.tickers:
+            combos = self.state.get(t, {}).get("combos")
+            if combos is not None:
+                ranking.add(combos)
+        top = ranking.top()
+        diff = ranking_diff(self.last_top, top, self.sort_key)
+        self.last_top = top
+        self.save()
+        return top, diff, stats
+
+def print_watch_tick(n: int, top: pd.DataFrame, diff: pd.DataFrame, stats: Dict[str, Dict]):
+    print(f"\n=== watch tick {n} at {datetime.now():%H:%M:%S} ===")
+    for t, st in stats.items():
+        if "error" in st:
+            print(f"{t}: failed: {st['error']}")
+        else:
+            print(f"{t}: {st['new']} new, {st['moved']} moved, {st['quotes']} quote changes, "
+                  f"{st['greeks_fetched']} Greeks fetched, combos {'recomputed' if st['recomputed'] else 'unchanged'}")
+    counts = diff["change"].value_counts().to_dict() if not diff.empty else {}
+    print(f"Ranking: {len(top)} combos; {counts.get('new', 0)} new, {counts.get('dropped', 0)} dropped, "
+          f"{counts.get('moved', 0)} moved")
+    if not diff.empty:
+        print(diff.head(20).to_string(index=False))
 
 # ---------------------------
 # CLI
 # ---------------------------
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from pmcc_serve import serve_main
+        return serve_main(sys.argv[2:])
     ap = argparse.ArgumentParser(description="PMCC multi-ticker screener & global ranker (NASDAQ API)")
-    ap.add_argument("--tickers", type=str, required=True,
+    ap.add_argument("--tickers", type=str, default="",
                     help="Comma-separated tickers, e.g. TSLA,AAPL,MSFT")
+    ap.add_argument("--tickers-file", type=str, default="",
+                    help="Universe mode: file with tickers (one per line or comma-separated, # comments); "
+                         "keeps only the global top --top-n combos (default 100)")
     ap.add_argument("--early-close-buffer", type=float, default=0.30,
                     help="Extra $ per share to pay when closing ITM short near expiry")
     ap.add_argument("--leaps-from", type=str, required=True, help="YYYY-MM-DD start for LEAPS")
@@ -435,12 +1682,113 @@ def main():
 
     ap.add_argument("--top-n-leaps",  type=int, default=8)
     ap.add_argument("--top-n-shorts", type=int, default=10)
+    ap.add_argument("--leaps-weights", type=str, default="",
+                    help="LEAPS score weights, e.g. 'delta=0.5,iv=0.2,spread=0.2,liquidity=0.1,anchor=0.80' "
+                         "(unset names keep these defaults)")
+    ap.add_argument("--short-weights", type=str, default="",
+                    help="Rank shorts by a weighted score instead of mid/iv/delta, e.g. "
+                         "'premium=0.5,delta=0.2,spread=0.2,liquidity=0.1,anchor=0.30'")
 
-    ap.add_argument("--sort", choices=["metric1","metric2"], default="metric1",
-                    help="metric1 = (short_strike/leap_strike)*100 (default), metric2 = (short_mid/leap_mid)*100")
+    ap.add_argument("--sort", choices=["metric1","metric2","risk"], default="metric1",
+                    help="metric1 = (short_strike/leap_strike)*100 (default), metric2 = (short_mid/leap_mid)*100, "
+                         "risk = P/L after a -1 sigma move by the short's expiry (implies --scenarios)")
     ap.add_argument("--excel", type=str, default="", help="If set, save results to this Excel file")
     ap.add_argument("--csv", type=str, default="", help="If set, save results to this CSV file")
+    ap.add_argument("--excel-per-ticker", action="store_true",
+                    help="--excel: also write one sheet per ticker (in ranking order)")
+    ap.add_argument("--print-rows", type=int, default=50,
+                    help="Print only the top N ranked combos to the console (0 = all)")
+    ap.add_argument("--full-precision", action="store_true",
+                    help="Export float64 values instead of downcasting to float32 (and labels to categoricals)")
+    ap.add_argument("--greeks-workers", type=int, default=4,
+                    help="Concurrent Greeks detail requests per ticker")
+    ap.add_argument("--max-rps", type=float, default=2.0,
+                    help="Global cap on NASDAQ requests per second (token bucket)")
+    ap.add_argument("--ticker-workers", type=int, default=4,
+                    help="Tickers screened concurrently")
+    ap.add_argument("--max-inflight", type=int, default=8,
+                    help="Global cap on NASDAQ requests in flight at once")
+    ap.add_argument("--top-n", type=int, default=None,
+                    help="Keep only the global top N combos (0 = all; default all, or 100 with --tickers-file)")
+    ap.add_argument("--stream", action="store_true",
+                    help="Print the running leaderboard (and rewrite --csv) as each ticker completes")
+    ap.add_argument("--greeks", choices=GREEKS_MODES, default="remote",
+                    help="remote = detail endpoint per contract, local = Black-Scholes from chain quotes, "
+                         "hybrid = local screening + remote Greeks for the shortlist only")
+    ap.add_argument("--greeks-search", choices=["ladder","full"], default="ladder",
+                    help="remote Greeks: ladder = bisect each expiry's strikes for the delta band, full = every contract")
+    ap.add_argument("--rate", type=float, default=0.04, help="Risk-free rate for local Greeks (decimal)")
+    ap.add_argument("--div-yield", type=float, default=0.0, help="Dividend yield for local Greeks (decimal)")
+    ap.add_argument("--cache-dir", type=str, default="",
+                    help="If set, cache NASDAQ responses on disk in this directory")
+    ap.add_argument("--cache-ttl", type=str, default="",
+                    help="Cache freshness in seconds: '600' for all endpoints or 'chain=300,detail=3600'")
+    ap.add_argument("--cache-max-mb", type=float, default=256,
+                    help="Evict least recently used responses beyond this size")
+    ap.add_argument("--assetclass-file", type=str, default="",
+                    help="JSON ticker -> stocks/etf map, read at start and updated as classes are discovered "
+                         "(defaults to assetclass.json in --cache-dir when that is set)")
+    ap.add_argument("--offline", action="store_true",
+                    help="Serve only from --cache-dir, never call NASDAQ")
+    ap.add_argument("--watch", type=float, default=0,
+                    help="Daemon mode: re-screen every N seconds, re-enriching only new contracts and those whose "
+                         "mid moved, and print how the ranking changed")
+    ap.add_argument("--watch-mid-move", type=float, default=WATCH_MID_MOVE,
+                    help="--watch: re-fetch Greeks for a contract when its mid moves by more than this fraction")
+    ap.add_argument("--watch-state", type=str, default="",
+                    help="--watch: pickle the in-memory state here after every tick and resume from it on start "
+                         "(defaults to watch_state.pkl in --cache-dir when that is set)")
+    ap.add_argument("--watch-ticks", type=int, default=0,
+                    help="--watch: stop after this many ticks (0 = run until interrupted)")
+    ap.add_argument("--archive", type=str, default="",
+                    help="Write every enriched chain snapshot to a Parquet archive in this directory")
+    ap.add_argument("--from-archive", type=str, default="",
+                    help="Re-screen from a Parquet archive instead of NASDAQ (no network calls)")
+    ap.add_argument("--as-of", type=str, default="",
+                    help="--from-archive: use each ticker's newest snapshot at or before this UTC time "
+                         "('YYYY-MM-DD' = end of that day, or 'YYYY-MM-DD HH:MM[:SS]'; default newest)")
+    ap.add_argument("--scenarios", action="store_true",
+                    help="Value every combo on a price x date grid up to the short's expiry and add break-even, "
+                         "max loss and +/-1 sigma P/L columns")
+    ap.add_argument("--scenario-range-pct", type=float, default=20.0,
+                    help="--scenarios: price grid spans spot +/- this %%")
+    ap.add_argument("--scenario-loss-pct", type=float, default=10.0,
+                    help="--scenarios: scenario_max_loss_$ is the worst P/L for moves within +/- this %%")
+    ap.add_argument("--scenario-npz", type=str, default="",
+                    help="Save the ranked combos' P/L grid (combos x prices x dates) to this .npz (implies --scenarios)")
+    ap.add_argument("--metrics-json", type=str, default="",
+                    help="If set, write a run report (HTTP latency, requests/retries, stage and per-ticker timings, "
+                         "contracts enriched vs kept, peak RSS) to this JSON file")
+    ap.add_argument("--profile", type=str, default="",
+                    help="If set, profile the run (all threads) with cProfile and dump the stats to this file")
+    ap.add_argument("--verbose", action="store_true",
+                    help="Log per-ticker details, e.g. how many contracts the ladder search enriched")
     args = ap.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s", stream=sys.stdout)
+    if args.offline and not args.cache_dir:
+        ap.error("--offline requires --cache-dir")
+    if not args.tickers and not args.tickers_file:
+        ap.error("one of --tickers or --tickers-file is required")
+    if args.top_n is None:
+        args.top_n = UNIVERSE_TOP_N if args.tickers_file else 0
+    if args.scenario_loss_pct > args.scenario_range_pct:
+        ap.error("--scenario-loss-pct cannot exceed --scenario-range-pct")
+    if args.as_of and not args.from_archive:
+        ap.error("--as-of requires --from-archive")
+    if args.from_archive and args.watch:
+        ap.error("--from-archive cannot be combined with --watch")
+    if args.offline and args.watch:
+        ap.error("--offline cannot be combined with --watch")   # watch mode never reads the response cache
+    try:
+        parse_as_of(args.as_of)
+    except ValueError:
+        ap.error("--as-of must look like YYYY-MM-DD or 'YYYY-MM-DD HH:MM[:SS]'")
+
+    try:
+        leaps_weights = parse_weights(args.leaps_weights, LeapsWeights) or LeapsWeights()
+        short_weights = parse_weights(args.short_weights, ShortWeights)
+    except ValueError as e:
+        ap.error(f"--leaps-weights/--short-weights: {e}")
 
     cfg = PMCCSelectionConfig(
         target_leaps_delta_low=args.target_delta_low,
@@ -449,22 +1797,126 @@ def main():
         short_delta_low=args.short_delta_low,
         short_delta_high=args.short_delta_high,
         early_close_buffer= args.early_close_buffer,
-        min_cushion_pct = args.min_cushion_pct
+        min_cushion_pct = args.min_cushion_pct,
+        leaps_weights=leaps_weights,
+        short_weights=short_weights,
     )
+    enrich = EnrichmentConfig(workers=args.greeks_workers, mode=args.greeks,
+                              rate=args.rate, div_yield=args.div_yield, search=args.greeks_search)
+    RATE_LIMITER.set_rate(args.max_rps)
+    set_max_inflight(args.max_inflight)
+    global RESPONSE_CACHE
+    if args.cache_dir and not args.watch:
+        try:
+            ttls = parse_cache_ttl(args.cache_ttl)
+        except ValueError as e:
+            ap.error(f"--cache-ttl: {e}")
+        RESPONSE_CACHE = ResponseCache(args.cache_dir, ttls=ttls,
+                                       max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                                       offline=args.offline)
+
+    global ASSETCLASS_RESOLVER
+    assetclass_file = args.assetclass_file or (os.path.join(args.cache_dir, "assetclass.json") if args.cache_dir else "")
+    if assetclass_file:
+        ASSETCLASS_RESOLVER = AssetClassResolver(assetclass_file)
+
+    global CHAIN_ARCHIVE
+    if args.archive:
+        CHAIN_ARCHIVE = ChainArchive(args.archive)
+
+    METRICS.reset()
+    profiler = ThreadProfiler() if args.profile else None
+    if profiler:
+        profiler.start()
+    try:
+        watch(args, cfg, enrich) if args.watch else run(args, cfg, enrich)
+    finally:
+        if profiler:
+            stats = profiler.stop()
+            stats.dump_stats(args.profile)
+            print(f"\nSaved cProfile stats to {args.profile}; top 20 by cumulative time:")
+            stats.sort_stats("cumulative").print_stats(20)
+        if args.metrics_json:
+            with open(args.metrics_json, "w") as f:
+                json.dump(METRICS.report(), f, indent=2)
+            print(f"Saved metrics to {args.metrics_json}")
+
+def read_tickers_file(path: str) -> List[str]:
+    """Tickers from a universe file: one per line or comma-separated, '#' starts a comment."""
+    tickers = []
+    with open(path) as f:
+        for line in f:
+            tickers.extend(t.strip().upper() for t in line.split("#", 1)[0].split(",") if t.strip())
+    return list(dict.fromkeys(tickers))
 
+def cli_tickers(args) -> List[str]:
     tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
-    all_leaps: List[pd.DataFrame] = []
-    all_shorts: List[pd.DataFrame] = []
+    if args.tickers_file:
+        tickers = list(dict.fromkeys(tickers + read_tickers_file(args.tickers_file)))
+    return tickers
 
-    for t in tickers:
-        print(f"\n=== Processing {t} ===")
-        leaps_df, shorts_df, spot = select_candidates_for_ticker(
-            ticker=t,
+def watch(args, cfg: PMCCSelectionConfig, enrich: EnrichmentConfig):
+    # quotes must be fresh every tick; Greeks are reused from the watcher's own state instead
+    if args.cache_dir:
+        print("watch: --cache-dir holds the asset-class map and watch state; responses are not cached")
+    state_path = args.watch_state or (os.path.join(args.cache_dir, "watch_state.pkl") if args.cache_dir else "")
+    watcher = Watcher(cli_tickers(args),
+                      windows=dict(leaps_from=args.leaps_from, leaps_to=args.leaps_to,
+                                   shorts_from=args.shorts_from, shorts_to=args.shorts_to),
+                      cfg=cfg, enrich=enrich, top_n_leaps=args.top_n_leaps, top_n_shorts=args.top_n_shorts,
+                      sort_key=args.sort, top_n=args.top_n, mid_move=args.watch_mid_move,
+                      state_path=state_path, workers=args.ticker_workers, scenarios=scenario_config(args))
+    n = 0
+    try:
+        while True:
+            started = time.monotonic()
+            top, diff, stats = watcher.tick()
+            n += 1
+            print_watch_tick(n, top, diff, stats)
+            if args.csv and not top.empty:
+                export_csv(top, args.csv, compact=not args.full_precision)
+            if args.watch_ticks and n >= args.watch_ticks:
+                break
+            time.sleep(max(0.0, args.watch - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print(f"\nwatch: stopped after {n} ticks")
+
+def scenario_config(args) -> Optional[ScenarioConfig]:
+    if not (args.scenarios or args.scenario_npz or args.sort == "risk"):
+        return None
+    return ScenarioConfig(range_pct=args.scenario_range_pct, loss_window_pct=args.scenario_loss_pct,
+                          rate=args.rate, div_yield=args.div_yield)
+
+def parse_as_of(text: str) -> Optional[datetime]:
+    if not text:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return datetime.strptime(text, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+
+def run(args, cfg: PMCCSelectionConfig, enrich: EnrichmentConfig):
+    tickers = cli_tickers(args)
+    ranking = GlobalRanking(sort_key=args.sort, top_n=args.top_n, order=tickers)
+    scenarios = scenario_config(args)
+    select = select_candidates_for_ticker
+    if args.from_archive:
+        select = partial(select_candidates_from_archive, archive=ChainArchive(args.from_archive),
+                         as_of=parse_as_of(args.as_of))
+
+    for done, (t, leaps_df, shorts_df, spot, err) in enumerate(screen_tickers(
+            tickers,
             leaps_from=args.leaps_from, leaps_to=args.leaps_to,
             shorts_from=args.shorts_from, shorts_to=args.shorts_to,
-            cfg=cfg,top_n_leaps=args.top_n_leaps,
-    top_n_shorts=args.top_n_shorts
-        )
+            cfg=cfg, top_n_leaps=args.top_n_leaps, top_n_shorts=args.top_n_shorts,
+            enrich=enrich, workers=args.ticker_workers, select=select), start=1):
+        print(f"\n=== {t} done ({done}/{len(tickers)}) ===")
+        if err is not None:
+            print(f"{t}: failed: {err}")
+            METRICS.count("tickers_failed")
+            continue
         if leaps_df.empty:
             print(f"{t}: No LEAPS candidates after filtering.")
         else:
@@ -474,32 +1926,44 @@ def main():
         else:
             print(f"{t}: SHORT candidates: {len(shorts_df)}")
 
-        all_leaps.append(leaps_df)
-        all_shorts.append(shorts_df)
+        ranking.add(build_combos([leaps_df], [shorts_df], sort_key=args.sort,
+                                 early_close_buffer=cfg.early_close_buffer, min_cushion_pct=cfg.min_cushion_pct,
+                                 scenarios=scenarios))
+        del leaps_df, shorts_df   # merged; only the ranking keeps rows from here on
+        if args.stream and len(ranking):
+            print(f"\n--- Leaderboard after {done}/{len(tickers)} tickers ---")
+            leaders = ranking.top(10)
+            print(leaders[display_columns(leaders)].to_string(index=False))
+            if args.csv:
+                export_csv(ranking.top(), args.csv, compact=not args.full_precision)
 
-    combos = build_combos(all_leaps, all_shorts, sort_key=args.sort, early_close_buffer=cfg.early_close_buffer, min_cushion_pct = cfg.min_cushion_pct)
+    combos = ranking.take()
+    del ranking   # the ranked frame below is the only copy of the results
     if combos.empty:
         print("\nNo combos found. Consider widening date windows or relaxing filters.")
         return
 
+    if args.scenario_npz:
+        with METRICS.stage("export"):
+            save_surface(args.scenario_npz, combos, scenarios, cfg.early_close_buffer)
+        print(f"Saved scenario grid ({len(combos)} combos x {scenarios.n_prices} prices x {scenarios.n_dates} dates) "
+              f"to {args.scenario_npz}")
+
     print("\n=== Global PMCC Combos (ranked) ===")
-    cols = [
-    "ticker","spot",
-    "leap_expiry","leap_strike","leap_mid","leap_delta","leap_iv",
-    "short_expiry","short_strike","short_mid","short_delta","short_iv",
-    "metric2_premium_over_leap_price_pct",
-    "leap_intrinsic_now","leap_intrinsic_pct_of_price",
-    "cushion_to_short_strike_pct",
-    "net_debit_per_spread","itm_close_pl_per_spread_$","itm_close_roi_pct_on_net",
-    ]
-    print(combos[cols].to_string(index=False))
+    shown = combos.head(args.print_rows) if args.print_rows else combos
+    if not args.full_precision:
+        shown = compact_combos(shown)   # print what the exports will hold
+    print(shown[display_columns(shown)].to_string(index=False))
+    if len(shown) < len(combos):
+        print(f"... {len(combos) - len(shown)} more combos (--print-rows 0 prints all; see --csv/--excel)")
 
     if args.excel:
-        with pd.ExcelWriter(args.excel) as writer:
-            combos.to_excel(writer, sheet_name="Combos", index=False)
+        with METRICS.stage("export"):
+            export_excel(combos, args.excel, per_ticker=args.excel_per_ticker, compact=not args.full_precision)
         print(f"\nSaved Excel to {args.excel}")
     if args.csv:
-        combos.to_csv(args.csv, index=False)
+        with METRICS.stage("export"):
+            export_csv(combos, args.csv, compact=not args.full_precision)
         print(f"Saved CSV to {args.csv}")
 
 if __name__ == "__main__":
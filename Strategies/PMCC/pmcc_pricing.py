@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Vectorized Black-Scholes-Merton pricing for European calls.
+
+Every function takes NumPy arrays (or scalars) that broadcast together:
+  S  spot, K strike, T years to expiry, r risk-free rate, q dividend yield,
+  sigma volatility (decimal, 0.35 = 35%).
+
+Greeks follow the NASDAQ detail page conventions:
+  theta per calendar day, vega per 1 vol point (0.01), gamma per $1.
+"""
+
+import numpy as np
+
+SQRT_2PI = np.sqrt(2.0 * np.pi)
+IV_LOW, IV_HIGH = 1e-4, 5.0
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def norm_cdf(x):
+    # erfc approximation (Numerical Recipes erfcc), |rel. error| < 1.2e-7
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418
+           + t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587
+           + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _d1_d2(S, K, T, r, q, sigma):
+    vt = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vt
+    return d1, d1 - vt
+
+
+def call_price(S, K, T, r, q, sigma):
+    S, K, T, sigma = (np.asarray(a, dtype=np.float64) for a in (S, K, T, sigma))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(S, K, T, r, q, sigma)
+        price = S * np.exp(-q * T) * norm_cdf(d1) - K * np.exp(-r * T) * norm_cdf(d2)
+    # at/after expiry the option is worth its intrinsic value
+    return np.where(T > 0, price, np.maximum(S - K, 0.0))
+
+
+def call_greeks(S, K, T, r, q, sigma) -> dict:
+    """Delta, gamma, theta (per day), vega (per vol point) of a call."""
+    S, K, T, sigma = (np.asarray(a, dtype=np.float64) for a in (S, K, T, sigma))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(S, K, T, r, q, sigma)
+        sqrt_t = np.sqrt(T)
+        disc_q, disc_r = np.exp(-q * T), np.exp(-r * T)
+        pdf = norm_pdf(d1)
+        delta = disc_q * norm_cdf(d1)
+        gamma = disc_q * pdf / (S * sigma * sqrt_t)
+        theta = (-S * disc_q * pdf * sigma / (2.0 * sqrt_t)
+                 - r * K * disc_r * norm_cdf(d2)
+                 + q * S * disc_q * norm_cdf(d1)) / 365.0
+        vega = S * disc_q * pdf * sqrt_t / 100.0
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
+
+
+def implied_vol(price, S, K, T, r, q, tol: float = 1e-6, max_iter: int = 60):
+    """
+    Solve call IV for a whole chain at once.
+    Newton steps guarded by a per-contract [lo, hi] bracket that falls back to
+    bisection when a step leaves it; prices outside no-arbitrage bounds get NaN.
+    """
+    price, S, K, T = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, S, K, T)))
+    price, S, K, T = price.copy(), S.copy(), K.copy(), T.copy()
+    lower = np.maximum(S * np.exp(-q * T) - K * np.exp(-r * T), 0.0)
+    upper = S * np.exp(-q * T)
+    valid = (T > 0) & (S > 0) & (K > 0) & np.isfinite(price) & (price > lower) & (price < upper)
+
+    lo = np.full(price.shape, IV_LOW)
+    hi = np.full(price.shape, IV_HIGH)
+    # Brenner-Subrahmanyam starting point
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.clip(np.sqrt(2.0 * np.pi / T) * price / S, 0.05, 2.0)
+    sigma = np.where(valid, sigma, np.nan)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        s = sigma[idx]
+        diff = call_price(S[idx], K[idx], T[idx], r, q, s) - price[idx]
+        done = np.abs(diff) < tol
+        # price is increasing in sigma: tighten the bracket around the root
+        hi[idx] = np.where(diff > 0, s, hi[idx])
+        lo[idx] = np.where(diff <= 0, s, lo[idx])
+        vega = call_greeks(S[idx], K[idx], T[idx], r, q, s)["vega"] * 100.0
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = s - diff / vega
+        bisect = ~np.isfinite(step) | (step <= lo[idx]) | (step >= hi[idx])
+        sigma[idx] = np.where(done, s, np.where(bisect, 0.5 * (lo[idx] + hi[idx]), step))
+        active[idx] = ~done & ((hi[idx] - lo[idx]) > tol)
+    return sigma
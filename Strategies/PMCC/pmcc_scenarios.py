@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Scenario (payoff) surfaces for ranked PMCC combos.
+
+Every combo is valued on a grid of underlying prices (spot ± range_pct) and
+dates (today .. the short's expiry) in one broadcast computation of shape
+(combos x prices x dates):
+  - the LEAPS is repriced with Black-Scholes at its own IV and remaining time
+  - the short is valued at its model price before expiry and at intrinsic on
+    expiry day, plus early_close_buffer when it finishes in the money
+P/L is in $ per spread against today's net debit. Combos are processed in
+chunks so the temporaries never exceed chunk_mb, however many there are.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pmcc_pricing import call_price
+
+SCENARIO_COLUMNS = [
+    "scenario_breakeven_price",      # lowest spot at the short's expiry where the spread breaks even
+    "scenario_breakeven_move_pct",   # ... as a % move from spot
+    "scenario_max_loss_$",           # worst P/L on the grid within ±loss_window_pct, any date
+    "scenario_pl_down_1sd_$",        # P/L at the short's expiry after a -1σ move (short IV)
+    "scenario_pl_up_1sd_$",          # ... after a +1σ move
+]
+BREAKEVEN_STEPS = 40   # bisection halvings; strike * 2**-40 is far below a cent
+
+
+@dataclass
+class ScenarioConfig:
+    range_pct: float = 20.0        # price grid spans spot * (1 ± range_pct / 100)
+    n_prices: int = 41
+    n_dates: int = 6               # evenly spaced from today to the short's expiry, both included
+    loss_window_pct: float = 10.0  # scenario_max_loss_$ looks at moves within ± this %
+    rate: float = 0.04
+    div_yield: float = 0.0
+    chunk_mb: float = 64.0         # cap on the float64 temporaries per chunk
+
+
+def _legs(combos: pd.DataFrame) -> dict:
+    num = lambda c: pd.to_numeric(combos[c], errors="coerce").astype("float64").to_numpy()
+    legs = {c: num(c) for c in ("spot", "leap_strike", "leap_dte", "leap_iv", "leap_mid",
+                                "short_strike", "short_dte", "short_iv", "short_mid")}
+    legs["debit"] = legs["leap_mid"] - legs["short_mid"]
+    return legs
+
+
+def spread_pl(S, days, leg: dict, buffer: float, cfg: ScenarioConfig) -> np.ndarray:
+    """$ P/L per spread at spot S after `days` calendar days; every leg array broadcasts against S and days."""
+    leap = call_price(S, leg["leap_strike"], np.maximum(leg["leap_dte"] - days, 0.0) / 365.0,
+                      cfg.rate, cfg.div_yield, leg["leap_iv"])
+    t_short = np.maximum(leg["short_dte"] - days, 0.0)
+    short = call_price(S, leg["short_strike"], t_short / 365.0, cfg.rate, cfg.div_yield, leg["short_iv"])
+    short = short + np.where((t_short <= 0) & (S > leg["short_strike"]), buffer, 0.0)
+    return (leap - short - leg["debit"]) * 100.0
+
+
+def grid(cfg: ScenarioConfig) -> Tuple[np.ndarray, np.ndarray]:
+    """(price moves in %, date fractions of the way to the short's expiry)."""
+    return (np.linspace(-cfg.range_pct, cfg.range_pct, cfg.n_prices),
+            np.linspace(0.0, 1.0, cfg.n_dates))
+
+
+def _chunk_rows(cfg: ScenarioConfig) -> int:
+    # ~8 float64 temporaries per node inside call_price
+    per_combo = cfg.n_prices * cfg.n_dates * 8 * 8
+    return max(1, int(cfg.chunk_mb * 1024 * 1024 // per_combo))
+
+
+def iter_surface(combos: pd.DataFrame, cfg: ScenarioConfig,
+                 buffer: float = 0.30) -> Iterator[Tuple[int, np.ndarray, dict]]:
+    """Yield (first row, P/L of shape (rows, prices, dates), leg arrays) chunk by chunk."""
+    moves, fracs = grid(cfg)
+    legs = _legs(combos)
+    step = _chunk_rows(cfg)
+    for lo in range(0, len(combos), step):
+        leg = {k: v[lo:lo + step] for k, v in legs.items()}
+        col = {k: v[:, None, None] for k, v in leg.items()}
+        S = col["spot"] * (1.0 + moves[None, :, None] / 100.0)
+        days = col["short_dte"] * fracs[None, None, :]
+        yield lo, spread_pl(S, days, col, buffer, cfg), leg
+
+
+def surface(combos: pd.DataFrame, cfg: ScenarioConfig, buffer: float = 0.30) -> np.ndarray:
+    """The full (combos x prices x dates) P/L grid as float32."""
+    out = np.empty((len(combos), cfg.n_prices, cfg.n_dates), dtype=np.float32)
+    for lo, pl, _ in iter_surface(combos, cfg, buffer):
+        out[lo:lo + len(pl)] = pl
+    return out
+
+
+def breakeven_at_expiry(leg: dict, buffer: float, cfg: ScenarioConfig) -> np.ndarray:
+    """
+    Lowest spot at the short's expiry where P/L reaches zero. Below the short
+    strike the spread only gains as spot rises, so bisect on (0, short_strike];
+    NaN when even the short strike loses money.
+    """
+    days = leg["short_dte"]
+    hi = leg["short_strike"].copy()
+    lo = np.zeros_like(hi)
+    ok = spread_pl(hi, days, leg, buffer, cfg) >= 0
+    for _ in range(BREAKEVEN_STEPS):
+        mid = (lo + hi) / 2.0
+        up = spread_pl(mid, days, leg, buffer, cfg) >= 0
+        hi, lo = np.where(up, mid, hi), np.where(up, lo, mid)
+    return np.where(ok, hi, np.nan)
+
+
+def scenario_summary(combos: pd.DataFrame, cfg: ScenarioConfig, buffer: float = 0.30) -> pd.DataFrame:
+    """SCENARIO_COLUMNS for every combo (row-aligned with `combos`), without keeping the surface."""
+    moves, _ = grid(cfg)
+    window = np.abs(moves) <= cfg.loss_window_pct + 1e-9
+    parts = []
+    for _, pl, leg in iter_surface(combos, cfg, buffer):
+        spot, days = leg["spot"], leg["short_dte"]
+        one_sd = leg["short_iv"] * np.sqrt(days / 365.0)
+        be = breakeven_at_expiry(leg, buffer, cfg)
+        with np.errstate(invalid="ignore"):
+            max_loss = pl[:, window, :].min(axis=(1, 2)) if window.any() else np.full(len(pl), np.nan)
+        parts.append(pd.DataFrame({
+            "scenario_breakeven_price": be,
+            "scenario_breakeven_move_pct": (be / spot - 1.0) * 100.0,
+            "scenario_max_loss_$": max_loss,
+            "scenario_pl_down_1sd_$": spread_pl(spot * np.exp(-one_sd), days, leg, buffer, cfg),
+            "scenario_pl_up_1sd_$": spread_pl(spot * np.exp(one_sd), days, leg, buffer, cfg),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=SCENARIO_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[SCENARIO_COLUMNS]
+
+
+def add_scenario_columns(combos: pd.DataFrame, cfg: ScenarioConfig, buffer: float = 0.30) -> pd.DataFrame:
+    if combos.empty:
+        return combos.reindex(columns=list(combos.columns) + SCENARIO_COLUMNS)
+    summary = scenario_summary(combos, cfg, buffer)
+    summary.index = combos.index
+    return pd.concat([combos, summary], axis=1)
+
+
+def save_surface(path: str, combos: pd.DataFrame, cfg: ScenarioConfig, buffer: float = 0.30):
+    """
+    Write the grid to a compressed .npz: pl (combos x prices x dates, float32),
+    moves_pct, days (combos x dates) and the combo keys, all loadable without pickle.
+    """
+    moves, fracs = grid(cfg)
+    dte = pd.to_numeric(combos["short_dte"], errors="coerce").astype("float64").to_numpy()
+    text = lambda c: combos[c].astype(str).to_numpy(dtype=str)
+    np.savez_compressed(
+        path,
+        pl=surface(combos, cfg, buffer),
+        moves_pct=moves.astype(np.float32),
+        days=(dte[:, None] * fracs[None, :]).astype(np.float32),
+        spot=combos["spot"].to_numpy(dtype=np.float32),
+        ticker=text("ticker"), leap_expiry=text("leap_expiry"), short_expiry=text("short_expiry"),
+        leap_strike=combos["leap_strike"].to_numpy(dtype=np.float32),
+        short_strike=combos["short_strike"].to_numpy(dtype=np.float32),
+    )
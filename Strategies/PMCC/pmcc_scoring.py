@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Column-wise scoring for the PMCC legs.
+
+score_leaps computes exactly what the old per-row score did (kept as
+score_leaps_row in benchmarks/bench_scoring.py), over whole columns at once,
+with the weights and the delta anchor taken from LeapsWeights (defaults
+0.5/0.2/0.2/0.1 around 0.80). Shorts keep their
+mid/iv/delta ordering unless ShortWeights are given, in which case
+score_shorts ranks them by a similar weighted 0..1 score. Both pick their
+top_n by partial selection (nlargest / argpartition) instead of sorting every row.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class LeapsWeights:
+    delta: float = 0.5
+    iv: float = 0.2
+    spread: float = 0.2
+    liquidity: float = 0.1
+    anchor: float = 0.80          # delta scores 1 here ...
+    width: float = 0.20           # ... and 0 this far away
+    liquidity_at: float = 5000.0  # volume + open interest that scores 1
+
+
+@dataclass
+class ShortWeights:
+    premium: float = 0.5
+    delta: float = 0.2
+    spread: float = 0.2
+    liquidity: float = 0.1
+    anchor: float = 0.30
+    width: float = 0.15
+    premium_at: float = 3.0       # mid as % of spot that scores 1
+    liquidity_at: float = 5000.0
+
+
+def parse_weights(text: str, cls):
+    """'delta=0.6,iv=0.1' -> cls(...) with those fields replaced; '' -> None."""
+    if not text:
+        return None
+    names = {f.name for f in fields(cls)}
+    values = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in names:
+            raise ValueError(f"unknown weight {name!r} (expected one of {', '.join(sorted(names))})")
+        values[name] = float(value)
+    return cls(**values)
+
+
+def _col(df: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    # float(row.get(col) or default): missing and zero become `default`, NaN stays NaN
+    if col not in df.columns:
+        return np.full(len(df), default)
+    x = pd.to_numeric(df[col], errors="coerce").astype("float64").to_numpy()
+    return np.where(x == 0, default, x)
+
+
+def _closeness(x: np.ndarray, anchor: float, width: float) -> np.ndarray:
+    # fmin(1, NaN) is 1, like Python's min(1.0, nan)
+    return 1.0 - np.fmin(1.0, np.abs(x - anchor) / width)
+
+
+def _spread(df: pd.DataFrame) -> np.ndarray:
+    bid, ask = _col(df, "bid", 0.0), _col(df, "ask", 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spr = np.where(ask > 0, (ask - bid) / ask, 1.0)
+    return 1.0 - np.fmin(1.0, spr)
+
+
+def _liquidity(df: pd.DataFrame, at: float) -> np.ndarray:
+    counts = lambda c: np.trunc(np.nan_to_num(_col(df, c, 0.0)))
+    return np.fmin(1.0, (counts("volume") + counts("openInterest")) / at)
+
+
+def score_leaps(df: pd.DataFrame, max_iv: float, w: Optional[LeapsWeights] = None) -> np.ndarray:
+    w = w or LeapsWeights()
+    delta_score = _closeness(_col(df, "delta", 0.0), w.anchor, w.width)      # closer to the anchor better
+    iv_score = 1.0 - np.fmin(1.0, _col(df, "iv", 1.0) / max(max_iv, 1e-6))   # lower better
+    return (w.delta * delta_score + w.iv * iv_score + w.spread * _spread(df)
+            + w.liquidity * _liquidity(df, w.liquidity_at))
+
+
+def score_shorts(df: pd.DataFrame, spot: float, w: Optional[ShortWeights] = None) -> np.ndarray:
+    w = w or ShortWeights()
+    mid = _col(df, "mid", 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        premium_score = np.fmin(1.0, np.fmax(mid / spot * 100.0 / w.premium_at, 0.0))
+    delta_score = _closeness(_col(df, "delta", 0.0), w.anchor, w.width)
+    return (w.premium * premium_score + w.delta * delta_score + w.spread * _spread(df)
+            + w.liquidity * _liquidity(df, w.liquidity_at))
+
+
+def top_leaps(df: pd.DataFrame, max_iv: float, top_n: int, w: Optional[LeapsWeights] = None) -> pd.DataFrame:
+    """The top_n LEAPS by score (a `score` column is added), best first."""
+    score = pd.Series(score_leaps(df, max_iv, w))
+    pick = score.nlargest(top_n, keep="first").index
+    return df.iloc[pick].assign(score=score.to_numpy()[pick])
+
+
+def top_shorts(df: pd.DataFrame, top_n: int, spot: float, w: Optional[ShortWeights] = None) -> pd.DataFrame:
+    """The top_n shorts: by score with weights (premium as % of `spot`), else by mid, iv (both high) then delta (low)."""
+    if w is not None:
+        score = pd.Series(score_shorts(df, spot, w))
+        pick = score.nlargest(top_n, keep="first").index
+        return df.iloc[pick].assign(score=score.to_numpy()[pick])
+    if top_n <= 0:
+        return df.iloc[:0]
+    num = lambda c: pd.to_numeric(df[c], errors="coerce").astype("float64").to_numpy()
+    mid, iv, delta = num("mid"), num("iv"), num("delta")
+    rows = np.arange(len(df))
+    if len(df) > top_n:
+        # partial selection: only rows whose mid reaches the top_n-th largest can make the cut
+        kth = np.partition(np.nan_to_num(mid, nan=-np.inf), len(df) - top_n)[len(df) - top_n]
+        cand = np.flatnonzero(mid >= kth)
+        rows = cand if len(cand) >= top_n else rows
+    # same order as sort_values(["mid", "iv", "delta"], ascending=[False, False, True]); NaN last
+    order = np.lexsort((rows, delta[rows], -iv[rows], -mid[rows]))
+    return df.iloc[rows[order][:top_n]]
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Serve mode for the PMCC screener: an HTTP/JSON API over the same screening
+pipeline as the CLI (screen_tickers -> build_combos -> GlobalRanking).
+
+Every request shares one response cache (MemoryCache, or the SQLite
+ResponseCache with --cache-dir), the in-flight request coalescing and the
+global NASDAQ rate limit, so concurrent clients asking for overlapping tickers
+do not multiply the upstream traffic.
+
+python pmcc_multi_screener.py serve --port 8765 --max-rps 2 --ticker-workers 4
+python pmcc_serve.py --port 8765          # same thing
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from dataclasses import replace
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+import pandas as pd
+
+import pmcc_multi_screener as screener
+from pmcc_multi_screener import (COMBO_COLUMNS, GREEKS_MODES, METRICS, RATE_LIMITER, AssetClassResolver,
+                                 EnrichmentConfig, GlobalRanking, MemoryCache, PMCCSelectionConfig, ResponseCache,
+                                 build_combos, cast_field, log, parse_cache_ttl, screen_tickers, set_max_inflight)
+from pmcc_scenarios import ScenarioConfig
+from pmcc_scoring import LeapsWeights, ShortWeights, parse_weights
+
+
+SERVE_PORT = 8765
+CSV_BATCH_ROWS = 5000
+# CLI spellings of PMCCSelectionConfig fields
+SERVE_ALIASES = {"target_delta_low": "target_leaps_delta_low", "target_delta_high": "target_leaps_delta_high"}
+WINDOW_PARAMS = ("leaps_from", "leaps_to", "shorts_from", "shorts_to")
+
+class BadRequest(ValueError):
+    pass
+
+def parse_screen_params(params: Dict[str, object], enrich: EnrichmentConfig) -> Dict:
+    """
+    Query-string or JSON parameters of a /screen request, named like the CLI
+    flags (dashes or underscores): tickers, the four date windows, sort, top_n,
+    top_n_leaps, top_n_shorts, greeks, leaps_weights, short_weights, format
+    (json/csv) and any numeric PMCCSelectionConfig field.
+    """
+    p = {str(k).replace("-", "_"): v for k, v in params.items()}
+    tickers = p.pop("tickers", "")
+    tickers = tickers.split(",") if isinstance(tickers, str) else list(tickers)
+    tickers = list(dict.fromkeys(str(t).strip().upper() for t in tickers if str(t).strip()))
+    if not tickers:
+        raise BadRequest("tickers is required")
+    windows = {}
+    for name in WINDOW_PARAMS:
+        value = str(p.pop(name, "") or "")
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise BadRequest(f"{name} is required, as YYYY-MM-DD")
+        windows[name] = value
+    req = {"tickers": tickers, "windows": windows,
+           "sort": str(p.pop("sort", "metric1")), "format": str(p.pop("format", "json")).lower()}
+    if req["sort"] not in ("metric1", "metric2", "risk"):
+        raise BadRequest("sort must be metric1, metric2 or risk")
+    if req["format"] not in ("json", "csv"):
+        raise BadRequest("format must be json or csv")
+    greeks = str(p.pop("greeks", enrich.mode))
+    if greeks not in GREEKS_MODES:
+        raise BadRequest(f"greeks must be one of {', '.join(GREEKS_MODES)}")
+    req["enrich"] = replace(enrich, mode=greeks)
+    try:
+        for name, default in (("top_n", 0), ("top_n_leaps", 8), ("top_n_shorts", 10)):
+            req[name] = int(p.pop(name, default))
+        leaps_weights = parse_weights(str(p.pop("leaps_weights", "") or ""), LeapsWeights) or LeapsWeights()
+        short_weights = parse_weights(str(p.pop("short_weights", "") or ""), ShortWeights)
+        overrides = {}
+        for key, value in p.items():
+            name = SERVE_ALIASES.get(key, key)
+            overrides[name] = cast_field(PMCCSelectionConfig, name, value)
+    except BadRequest:
+        raise
+    except (TypeError, ValueError) as e:
+        raise BadRequest(str(e))
+    req["cfg"] = PMCCSelectionConfig(**overrides, leaps_weights=leaps_weights, short_weights=short_weights)
+    return req
+
+def serve_screen(req: Dict, workers: int,
+                 scenarios: Optional[ScenarioConfig] = None) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Run one parsed /screen request; returns (ranked combos, ticker -> error).
+    `scenarios` (the server's) prices sort=risk requests.
+    """
+    cfg = req["cfg"]
+    scenarios = (scenarios or ScenarioConfig()) if req["sort"] == "risk" else None
+    ranking = GlobalRanking(sort_key=req["sort"], top_n=req["top_n"], order=req["tickers"])
+    errors: Dict[str, str] = {}
+    for t, leaps_df, shorts_df, spot, err in screen_tickers(
+            req["tickers"], **req["windows"], cfg=cfg,
+            top_n_leaps=req["top_n_leaps"], top_n_shorts=req["top_n_shorts"],
+            enrich=req["enrich"], workers=workers):
+        if err is not None:
+            errors[t] = str(err)
+            continue
+        ranking.add(build_combos([leaps_df], [shorts_df], sort_key=req["sort"],
+                                 early_close_buffer=cfg.early_close_buffer, min_cushion_pct=cfg.min_cushion_pct,
+                                 scenarios=scenarios))
+    return ranking.top(), errors
+
+class ScreenerHandler(BaseHTTPRequestHandler):
+    """GET /health, GET /metrics, GET or POST /screen (query string and/or JSON body)."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/health":
+            cache = screener.RESPONSE_CACHE.stats() if isinstance(screener.RESPONSE_CACHE, MemoryCache) else {}
+            self._send_json(200, {"status": "ok", "cache": cache})
+        elif parts.path == "/metrics":
+            self._send_json(200, METRICS.report())
+        elif parts.path == "/screen":
+            self._screen(dict(parse_qsl(parts.query)))
+        else:
+            self._send_json(404, {"error": f"no route {parts.path}"})
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        if parts.path != "/screen":
+            return self._send_json(404, {"error": f"no route {parts.path}"})
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return self._send_json(400, {"error": "body must be a JSON object"})
+        params = {**dict(parse_qsl(parts.query)), **payload}
+        self._screen(params)
+
+    def _screen(self, params: Dict):
+        try:
+            req = parse_screen_params(params, self.server.enrich)
+        except BadRequest as e:
+            return self._send_json(400, {"error": str(e)})
+        METRICS.count("serve_requests")
+        t0 = time.perf_counter()
+        try:
+            with METRICS.stage("serve_screen"):
+                combos, errors = serve_screen(req, self.server.workers, self.server.scenarios)
+        except Exception as e:
+            log.exception("serve: /screen failed for %s", ",".join(req["tickers"]))
+            METRICS.count("serve_errors")
+            return self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        if req["format"] == "csv":
+            return self._send_csv(combos, errors)
+        head = json.dumps({"tickers": len(req["tickers"]), "errors": errors, "count": len(combos),
+                           "elapsed_s": round(time.perf_counter() - t0, 3)})
+        records = combos.to_json(orient="records") if len(combos) else "[]"
+        self._send(200, "application/json", f'{head[:-1]}, "combos": {records}}}'.encode())
+
+    def _send(self, status: int, content_type: str, payload: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status: int, body: Dict):
+        self._send(status, "application/json", json.dumps(body).encode())
+
+    def _send_csv(self, combos: pd.DataFrame, errors: Dict[str, str]):
+        # chunked, a batch of rows at a time, so the whole CSV is never built as one string
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Transfer-Encoding", "chunked")
+        if errors:
+            self.send_header("X-Failed-Tickers", ",".join(errors))
+        self.end_headers()
+        columns = list(combos.columns) or COMBO_COLUMNS
+        for lo in range(0, max(len(combos), 1), CSV_BATCH_ROWS):
+            part = combos.iloc[lo:lo + CSV_BATCH_ROWS].to_csv(index=False, header=lo == 0, columns=columns).encode()
+            self.wfile.write(f"{len(part):X}\r\n".encode() + part + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+class ScreenerServer(ThreadingHTTPServer):
+    """One request per thread; all of them share RESPONSE_CACHE, IN_FLIGHT_CALLS and the request budget."""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], enrich: EnrichmentConfig, workers: int = 4, quiet: bool = False,
+                 scenarios: Optional[ScenarioConfig] = None):
+        super().__init__(address, ScreenerHandler)
+        self.enrich, self.workers, self.quiet = enrich, workers, quiet
+        # sort=risk pricing; like the CLI's scenario_config, at the server's --rate/--div-yield
+        self.scenarios = scenarios or ScenarioConfig(rate=enrich.rate, div_yield=enrich.div_yield)
+
+def serve_main(argv: List[str]):
+    ap = argparse.ArgumentParser(prog="pmcc_multi_screener.py serve",
+                                 description="Serve the PMCC screener as an HTTP/JSON API with a shared cache")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=SERVE_PORT)
+    ap.add_argument("--ticker-workers", type=int, default=4, help="Tickers screened concurrently per request")
+    ap.add_argument("--greeks-workers", type=int, default=4)
+    ap.add_argument("--greeks", choices=GREEKS_MODES, default="remote", help="Default Greeks mode for requests")
+    ap.add_argument("--greeks-search", choices=["ladder","full"], default="ladder")
+    ap.add_argument("--rate", type=float, default=0.04)
+    ap.add_argument("--div-yield", type=float, default=0.0)
+    ap.add_argument("--scenario-range-pct", type=float, default=20.0, help="sort=risk: price grid, spot ± this %%")
+    ap.add_argument("--scenario-loss-pct", type=float, default=10.0,
+                    help="sort=risk: worst loss is taken over moves within ± this %%")
+    ap.add_argument("--max-rps", type=float, default=2.0, help="Global cap on NASDAQ requests per second")
+    ap.add_argument("--max-inflight", type=int, default=8, help="Global cap on NASDAQ requests in flight")
+    ap.add_argument("--cache-dir", type=str, default="",
+                    help="Keep the shared cache on disk (SQLite) instead of in memory")
+    ap.add_argument("--cache-ttl", type=str, default="", help="Same format as the screener's --cache-ttl")
+    ap.add_argument("--cache-max-mb", type=float, default=256)
+    ap.add_argument("--assetclass-file", type=str, default="")
+    ap.add_argument("--quiet", action="store_true", help="Do not log each request")
+    ap.add_argument("--verbose", action="store_true",
+                    help="Also log the per-ticker screening output (candidate frames, Greeks accuracy, ...)")
+    args = ap.parse_args(argv)
+    # per-request screening output stays out of the server log unless asked for; warnings still show
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format="%(message)s")
+    if args.scenario_loss_pct > args.scenario_range_pct:
+        ap.error("--scenario-loss-pct cannot exceed --scenario-range-pct")
+
+    try:
+        ttls = parse_cache_ttl(args.cache_ttl)
+    except ValueError as e:
+        ap.error(f"--cache-ttl: {e}")
+    max_bytes = int(args.cache_max_mb * 1024 * 1024)
+    screener.RESPONSE_CACHE = ResponseCache(args.cache_dir, ttls=ttls, max_bytes=max_bytes) if args.cache_dir \
+        else MemoryCache(ttls=ttls, max_bytes=max_bytes)
+    assetclass_file = args.assetclass_file or (os.path.join(args.cache_dir, "assetclass.json") if args.cache_dir else "")
+    if assetclass_file:
+        screener.ASSETCLASS_RESOLVER = AssetClassResolver(assetclass_file)
+    RATE_LIMITER.set_rate(args.max_rps)
+    set_max_inflight(args.max_inflight)
+    METRICS.reset()
+
+    enrich = EnrichmentConfig(workers=args.greeks_workers, mode=args.greeks, rate=args.rate,
+                              div_yield=args.div_yield, search=args.greeks_search)
+    scenarios = ScenarioConfig(range_pct=args.scenario_range_pct, loss_window_pct=args.scenario_loss_pct,
+                               rate=args.rate, div_yield=args.div_yield)
+    server = ScreenerServer((args.host, args.port), enrich, workers=args.ticker_workers, quiet=args.quiet,
+                            scenarios=scenarios)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} (GET /screen?tickers=...&leaps_from=..., POST /screen, /health, /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nserve: stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve_main(sys.argv[1:])